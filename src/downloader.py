@@ -1,55 +1,164 @@
 """Download detail PDFs from S3 pre-signed URLs to .tmp/ cache."""
 
+import asyncio
+import json
+import logging
+import os
 from pathlib import Path
 
 import httpx
 
+log = logging.getLogger("swiggyit")
+
 TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+# Bound on in-flight requests so we don't hammer S3 with hundreds of GETs.
+MAX_CONCURRENCY = 16
+
+# Streaming chunk size: keeps one 64 KB buffer resident per download
+# instead of the whole PDF body.
+CHUNK_SIZE = 64 * 1024
 
 
-def download_detail_pdfs(
+def make_client() -> httpx.AsyncClient:
+    """Build the pooled HTTP client used for detail downloads.
+
+    Callers that process multiple phases should create one client and
+    pass it to every download_detail_pdfs call, so the food and
+    instamart phases reuse the same connections instead of paying a
+    fresh DNS lookup + TLS handshake per phase.
+    """
+    # http2=True is deliberately not set: it needs the optional h2
+    # dependency (httpx[http2]), and the S3 pre-signed URLs these
+    # downloads hit are served over HTTP/1.1 anyway, so enabling it
+    # would add a dependency without changing the negotiated protocol.
+    return httpx.AsyncClient(timeout=TIMEOUT, follow_redirects=True, limits=LIMITS)
+
+
+async def download_detail_pdfs(
     orders: list,
     order_type: str,
     tmp_dir: Path,
+    client: httpx.AsyncClient | None = None,
 ) -> dict[str, Path]:
     """Download detail PDFs for a list of OrderRow objects.
 
-    Returns a dict mapping order_id -> local file path.
-    Skips downloads if file already exists (cache).
+    Fetches concurrently (bounded by MAX_CONCURRENCY) over a pooled
+    connection; pass `client` to share one pool across calls, else a
+    client is created for this call. Returns a dict mapping
+    order_id -> local file path. Skips downloads if file already
+    exists (cache).
     """
+    if client is None:
+        async with make_client() as own_client:
+            return await download_detail_pdfs(orders, order_type, tmp_dir, own_client)
+
     out_dir = tmp_dir / f"detail_{order_type}"
     out_dir.mkdir(parents=True, exist_ok=True)
 
+    # ETags persisted per order_id: lets us revalidate a cached file with a
+    # conditional GET (S3 answers 304 without a body) instead of trusting
+    # the local copy forever or re-downloading it in full.
+    etag_path = tmp_dir / "etags.json"
+    try:
+        etags = json.loads(etag_path.read_text())
+    except (OSError, ValueError):
+        etags = {}
+
     results = {}
     skipped = 0
     downloaded = 0
     failed = 0
 
-    with httpx.Client(timeout=TIMEOUT, follow_redirects=True) as client:
-        for order in orders:
-            file_path = out_dir / f"{order.order_id}.pdf"
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    async def _fetch(client: httpx.AsyncClient, order) -> None:
+        nonlocal skipped, downloaded, failed
+        file_path = out_dir / f"{order.order_id}.pdf"
+
+        have_file = file_path.exists() and file_path.stat().st_size > 0
+        etag = etags.get(order.order_id)
+        if have_file and not etag:
+            # No ETag recorded; trust the local copy outright
+            results[order.order_id] = file_path
+            skipped += 1
+            return
 
-            if file_path.exists() and file_path.stat().st_size > 0:
+        if not order.detail_url:
+            log.info(f"  No URL for order {order.order_id}, skipping")
+            failed += 1
+            return
+
+        # Write to a .part file and rename on success so an interrupted
+        # download never leaves a truncated PDF that passes the cache check.
+        part_path = file_path.with_suffix(".pdf.part")
+        headers = {"If-None-Match": etag} if (have_file and etag) else None
+        try:
+            async with semaphore:
+                async with client.stream(
+                    "GET", order.detail_url, headers=headers
+                ) as resp:
+                    if resp.status_code == 304:
+                        # Unchanged on the server; local copy is current
+                        results[order.order_id] = file_path
+                        skipped += 1
+                        return
+                    resp.raise_for_status()
+                    new_etag = resp.headers.get("etag")
+                    # Verify the magic bytes as they stream past, so a
+                    # bad body never enters the cache and downstream
+                    # code can trust what this process wrote.
+                    prefix = b""
+                    with open(part_path, "wb") as f:
+                        async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                            if len(prefix) < 5:
+                                prefix += chunk[: 5 - len(prefix)]
+                            f.write(chunk)
+            if prefix != b"%PDF-":
+                part_path.unlink(missing_ok=True)
+                if have_file:
+                    # Expired pre-signed URLs answer 200 with an XML
+                    # error body; like a failed revalidation, the
+                    # verified local copy is still the best we have
+                    log.info(
+                        f"  Not a PDF response for order {order.order_id}, "
+                        f"using cached copy"
+                    )
+                    results[order.order_id] = file_path
+                    skipped += 1
+                    return
+                log.info(f"  Not a PDF response for order {order.order_id}, skipping")
+                failed += 1
+                return
+            os.replace(part_path, file_path)
+            if new_etag:
+                etags[order.order_id] = new_etag
+            results[order.order_id] = file_path
+            downloaded += 1
+        except httpx.HTTPError as e:
+            part_path.unlink(missing_ok=True)
+            if have_file:
+                # Revalidation failed (offline, expired URL, transient
+                # error) but the verified local copy is still good --
+                # degrade to serving it from cache like before ETags
+                log.info(
+                    f"  Revalidation failed for order {order.order_id}, "
+                    f"using cached copy: {e}"
+                )
                 results[order.order_id] = file_path
                 skipped += 1
-                continue
+                return
+            log.info(f"  Failed to download order {order.order_id}: {e}")
+            failed += 1
 
-            if not order.detail_url:
-                print(f"  No URL for order {order.order_id}, skipping")
-                failed += 1
-                continue
+    async with asyncio.TaskGroup() as tg:
+        for order in orders:
+            tg.create_task(_fetch(client, order))
 
-            try:
-                resp = client.get(order.detail_url)
-                resp.raise_for_status()
-                file_path.write_bytes(resp.content)
-                results[order.order_id] = file_path
-                downloaded += 1
-            except httpx.HTTPError as e:
-                print(f"  Failed to download order {order.order_id}: {e}")
-                failed += 1
+    etag_path.write_text(json.dumps(etags))
 
-    print(
+    log.info(
         f"  {order_type}: {downloaded} downloaded, "
         f"{skipped} cached, {failed} failed"
     )
@@ -1,83 +1,324 @@
 """Upsert parsed invoice data into PostgreSQL."""
 
+import hashlib
+from decimal import Decimal
+from pathlib import Path
+
 import psycopg
 
 from validator import validate_date, validate_order_id
 
+# Item rows are bulk-loaded through UNLOGGED staging tables: COPY into the
+# stage writes no WAL, then one INSERT ... SELECT per summary moves the rows
+# into the logged tables.
+STAGING_TABLES = {
+    "food_order_items_stage": "food_order_items",
+    "instamart_order_items_stage": "instamart_order_items",
+}
 
-def upsert_customer(conn, name: str, email: str, gstin: str, address: str) -> int:
-    """Upsert a customer and return the customer_id."""
+# Data columns moved on flush. Named explicitly so the insert never
+# depends on physical column order, and so the serial id is assigned by
+# the target table rather than copied out of the stage.
+STAGING_COLUMNS = {
+    "food_order_items": (
+        "order_id", "sr_no", "description", "unit_of_measure",
+        "quantity", "unit_price", "amount", "discount",
+        "net_assessable_value",
+    ),
+    "instamart_order_items": (
+        "order_id", "sr_no", "description", "quantity", "uqc",
+        "hsn_sac_code", "taxable_value", "discount", "net_taxable_value",
+        "cgst_rate", "cgst_amount", "sgst_rate", "sgst_amount",
+        "cess_rate", "cess_amount", "additional_cess", "total_amount",
+    ),
+}
+
+# SQL lives in module-level constants: the same string object is passed to
+# psycopg on every call, so the prepared-statement cache hits by identity
+# and the server executes without re-parse/re-plan.
+
+CUSTOMER_UPSERT_SQL = """
+    INSERT INTO customers (name, email, gstin, address)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (email) DO UPDATE SET
+        name = EXCLUDED.name,
+        address = EXCLUDED.address
+    RETURNING id
+"""
+
+FOOD_ORDER_UPSERT_SQL = """
+    INSERT INTO food_orders (
+        order_id, customer_id, invoice_no, document_type,
+        date_of_invoice, hsn_code, service_description, category,
+        reverse_charges, restaurant_name, restaurant_gstin,
+        restaurant_fssai, restaurant_address, restaurant_state,
+        place_of_supply, subtotal, igst_rate, igst_amount,
+        cgst_rate, cgst_amount, sgst_rate, sgst_amount,
+        total_taxes, invoice_total, eco_name, eco_gstin,
+        eco_fssai, eco_address, detail_pdf_url
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+    ON CONFLICT (order_id) DO UPDATE SET
+        customer_id = EXCLUDED.customer_id,
+        invoice_no = EXCLUDED.invoice_no,
+        document_type = EXCLUDED.document_type,
+        date_of_invoice = EXCLUDED.date_of_invoice,
+        hsn_code = EXCLUDED.hsn_code,
+        service_description = EXCLUDED.service_description,
+        category = EXCLUDED.category,
+        reverse_charges = EXCLUDED.reverse_charges,
+        restaurant_name = EXCLUDED.restaurant_name,
+        restaurant_gstin = EXCLUDED.restaurant_gstin,
+        restaurant_fssai = EXCLUDED.restaurant_fssai,
+        restaurant_address = EXCLUDED.restaurant_address,
+        restaurant_state = EXCLUDED.restaurant_state,
+        place_of_supply = EXCLUDED.place_of_supply,
+        subtotal = EXCLUDED.subtotal,
+        igst_rate = EXCLUDED.igst_rate,
+        igst_amount = EXCLUDED.igst_amount,
+        cgst_rate = EXCLUDED.cgst_rate,
+        cgst_amount = EXCLUDED.cgst_amount,
+        sgst_rate = EXCLUDED.sgst_rate,
+        sgst_amount = EXCLUDED.sgst_amount,
+        total_taxes = EXCLUDED.total_taxes,
+        invoice_total = EXCLUDED.invoice_total,
+        eco_name = EXCLUDED.eco_name,
+        eco_gstin = EXCLUDED.eco_gstin,
+        eco_fssai = EXCLUDED.eco_fssai,
+        eco_address = EXCLUDED.eco_address,
+        detail_pdf_url = EXCLUDED.detail_pdf_url,
+        updated_at = NOW()
+"""
+
+FOOD_ITEMS_DELETE_SQL = "DELETE FROM food_order_items WHERE order_id = %s"
+
+FOOD_ITEMS_COPY_SQL = """
+    COPY food_order_items_stage (
+        order_id, sr_no, description, unit_of_measure,
+        quantity, unit_price, amount, discount, net_assessable_value
+    ) FROM STDIN WITH (FORMAT BINARY)
+"""
+
+# Column types for binary COPY: values are serialized with psycopg's binary
+# adapters (no float/decimal-to-text formatting, fewer bytes on the wire).
+FOOD_ITEMS_COPY_TYPES = [
+    "int8", "int4", "text", "text", "int4",
+    "numeric", "numeric", "numeric", "numeric",
+]
+
+INSTAMART_ORDER_UPSERT_SQL = """
+    INSERT INTO instamart_orders (
+        order_id, customer_id, invoice_no, document_type,
+        date_of_invoice, category, seller_name, seller_gstin,
+        seller_fssai, seller_address, seller_city, seller_state,
+        place_of_supply, invoice_value, detail_pdf_url
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s
+    )
+    ON CONFLICT (order_id) DO UPDATE SET
+        customer_id = EXCLUDED.customer_id,
+        invoice_no = EXCLUDED.invoice_no,
+        document_type = EXCLUDED.document_type,
+        date_of_invoice = EXCLUDED.date_of_invoice,
+        category = EXCLUDED.category,
+        seller_name = EXCLUDED.seller_name,
+        seller_gstin = EXCLUDED.seller_gstin,
+        seller_fssai = EXCLUDED.seller_fssai,
+        seller_address = EXCLUDED.seller_address,
+        seller_city = EXCLUDED.seller_city,
+        seller_state = EXCLUDED.seller_state,
+        place_of_supply = EXCLUDED.place_of_supply,
+        invoice_value = EXCLUDED.invoice_value,
+        detail_pdf_url = EXCLUDED.detail_pdf_url,
+        updated_at = NOW()
+"""
+
+INSTAMART_ITEMS_DELETE_SQL = (
+    "DELETE FROM instamart_order_items WHERE order_id = %s"
+)
+
+INSTAMART_ITEMS_COPY_SQL = """
+    COPY instamart_order_items_stage (
+        order_id, sr_no, description, quantity, uqc,
+        hsn_sac_code, taxable_value, discount, net_taxable_value,
+        cgst_rate, cgst_amount, sgst_rate, sgst_amount,
+        cess_rate, cess_amount, additional_cess, total_amount
+    ) FROM STDIN WITH (FORMAT BINARY)
+"""
+
+INSTAMART_ITEMS_COPY_TYPES = [
+    "int8", "int4", "text", "int4", "text", "text",
+    "numeric", "numeric", "numeric", "numeric", "numeric",
+    "numeric", "numeric", "numeric", "numeric", "numeric", "numeric",
+]
+
+HANDLING_FEE_UPSERT_SQL = """
+    INSERT INTO instamart_handling_fees (
+        order_id, invoice_no, date_of_invoice, hsn_code,
+        hsn_description, category, transaction_type, invoice_type,
+        reverse_charges, swiggy_pan, swiggy_gstin, swiggy_address,
+        swiggy_pincode, swiggy_state_code, description, unit_price,
+        discount, net_assessable_value, cgst_rate, cgst_amount,
+        sgst_rate, sgst_amount, state_cess_rate, state_cess_amount,
+        total_taxes, invoice_total
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+        %s, %s, %s, %s, %s, %s
+    )
+    ON CONFLICT (order_id) DO UPDATE SET
+        invoice_no = EXCLUDED.invoice_no,
+        date_of_invoice = EXCLUDED.date_of_invoice,
+        hsn_code = EXCLUDED.hsn_code,
+        hsn_description = EXCLUDED.hsn_description,
+        category = EXCLUDED.category,
+        transaction_type = EXCLUDED.transaction_type,
+        invoice_type = EXCLUDED.invoice_type,
+        reverse_charges = EXCLUDED.reverse_charges,
+        swiggy_pan = EXCLUDED.swiggy_pan,
+        swiggy_gstin = EXCLUDED.swiggy_gstin,
+        swiggy_address = EXCLUDED.swiggy_address,
+        swiggy_pincode = EXCLUDED.swiggy_pincode,
+        swiggy_state_code = EXCLUDED.swiggy_state_code,
+        description = EXCLUDED.description,
+        unit_price = EXCLUDED.unit_price,
+        discount = EXCLUDED.discount,
+        net_assessable_value = EXCLUDED.net_assessable_value,
+        cgst_rate = EXCLUDED.cgst_rate,
+        cgst_amount = EXCLUDED.cgst_amount,
+        sgst_rate = EXCLUDED.sgst_rate,
+        sgst_amount = EXCLUDED.sgst_amount,
+        state_cess_rate = EXCLUDED.state_cess_rate,
+        state_cess_amount = EXCLUDED.state_cess_amount,
+        total_taxes = EXCLUDED.total_taxes,
+        invoice_total = EXCLUDED.invoice_total
+"""
+
+
+def _food_item_row(order_id: int, item) -> tuple:
+    """Build one binary-COPY row for a food item.
+
+    The parser stores amounts as floats, but the numeric columns in
+    FOOD_ITEMS_COPY_TYPES are serialized by psycopg's binary numeric
+    dumper, which only accepts Decimal -- convert at the boundary.
+    """
+    return (
+        order_id, item.sr_no, item.description,
+        item.unit_of_measure, item.quantity,
+        Decimal(str(item.unit_price)), Decimal(str(item.amount)),
+        Decimal(str(item.discount)),
+        Decimal(str(item.net_assessable_value)),
+    )
+
+
+def _instamart_item_row(order_id: int, item) -> tuple:
+    """Build one binary-COPY row for an instamart item; see _food_item_row."""
+    return (
+        order_id, item.sr_no, item.description, item.quantity,
+        item.uqc, item.hsn_sac_code,
+        Decimal(str(item.taxable_value)), Decimal(str(item.discount)),
+        Decimal(str(item.net_taxable_value)),
+        Decimal(str(item.cgst_rate)), Decimal(str(item.cgst_amount)),
+        Decimal(str(item.sgst_rate)), Decimal(str(item.sgst_amount)),
+        Decimal(str(item.cess_rate)), Decimal(str(item.cess_amount)),
+        Decimal(str(item.additional_cess)), Decimal(str(item.total_amount)),
+    )
+
+
+def ensure_schema(conn, schema_path: Path) -> bool:
+    """Apply schema.sql only when its content hash changed.
+
+    The hash of the last applied file is kept in _schema_meta; when it
+    matches, startup skips the CREATE TABLE round-trips and their commit
+    entirely. Returns True if the schema was (re)applied.
+    """
+    schema_sql = schema_path.read_text()
+    current = hashlib.blake2b(schema_sql.encode()).hexdigest()
     with conn.cursor() as cur:
         cur.execute(
-            """
-            INSERT INTO customers (name, email, gstin, address)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (email) DO UPDATE SET
-                name = EXCLUDED.name,
-                address = EXCLUDED.address
-            RETURNING id
-            """,
-            (name, email, gstin, address),
+            "CREATE TABLE IF NOT EXISTS _schema_meta (hash text PRIMARY KEY)"
         )
+        cur.execute("SELECT 1 FROM _schema_meta WHERE hash = %s", (current,))
+        if cur.fetchone():
+            conn.commit()
+            return False
+        # Multi-statement script; can't go through a prepared statement
+        cur.execute(schema_sql, prepare=False)
+        cur.execute("DELETE FROM _schema_meta")
+        cur.execute("INSERT INTO _schema_meta (hash) VALUES (%s)", (current,))
+    conn.commit()
+    return True
+
+
+def ensure_item_staging(conn, recreate: bool = False):
+    """Create the UNLOGGED staging tables if they don't exist yet.
+
+    Pass recreate=True after a schema change so the stages are rebuilt
+    against the current table shape instead of keeping stale columns.
+    """
+    with conn.cursor() as cur:
+        for stage, target in STAGING_TABLES.items():
+            if recreate:
+                cur.execute(f"DROP TABLE IF EXISTS {stage}")
+            cur.execute(
+                f"CREATE UNLOGGED TABLE IF NOT EXISTS {stage} "
+                f"(LIKE {target} INCLUDING DEFAULTS)"
+            )
+    conn.commit()
+
+
+def flush_item_staging(conn):
+    """Move staged item rows into the permanent tables and clear the stage.
+
+    Keeps only the newest staged row per (order_id, sr_no): the per-order
+    DELETE in the upserts clears the target, but an order staged twice in
+    one batch would otherwise land both item sets and trip the unique
+    constraint. ON CONFLICT guards whatever the delete didn't cover.
+    """
+    with conn.cursor() as cur:
+        for stage, target in STAGING_TABLES.items():
+            cols = ", ".join(STAGING_COLUMNS[target])
+            cur.execute(
+                f"INSERT INTO {target} ({cols}) "
+                f"SELECT DISTINCT ON (order_id, sr_no) {cols} FROM {stage} "
+                f"ORDER BY order_id, sr_no, id DESC "
+                f"ON CONFLICT (order_id, sr_no) DO NOTHING"
+            )
+            cur.execute(f"TRUNCATE {stage}")
+
+
+def upsert_customer(conn, name: str, email: str, gstin: str, address: str) -> int:
+    """Upsert a customer and return the customer_id."""
+    with conn.cursor() as cur:
+        cur.execute(CUSTOMER_UPSERT_SQL, (name, email, gstin, address))
         return cur.fetchone()[0]
 
 
-def upsert_food_order(conn, inv, customer_id: int, detail_url: str):
-    """Upsert a food order and its items."""
+def upsert_food_order(cur, inv, customer_id: int, detail_url: str):
+    """Upsert a food order and its items.
+
+    Takes a cursor rather than a connection so callers loading a whole
+    summary reuse one cursor across orders instead of allocating one
+    per order.
+    """
     validate_order_id(inv.order_id, "food order")
     order_id = int(inv.order_id)
+    # Validate up front so no CPU-bound work runs while the cursor is held
+    inv_date = validate_date(inv.date_of_invoice, "food order")
 
-    with conn.cursor() as cur:
+    # Pipeline mode streams statements without waiting for each reply,
+    # so the header insert + item delete cost ~1 round-trip. COPY is
+    # not allowed inside a pipeline, so items go through COPY after.
+    with cur.connection.pipeline():
         cur.execute(
-            """
-            INSERT INTO food_orders (
-                order_id, customer_id, invoice_no, document_type,
-                date_of_invoice, hsn_code, service_description, category,
-                reverse_charges, restaurant_name, restaurant_gstin,
-                restaurant_fssai, restaurant_address, restaurant_state,
-                place_of_supply, subtotal, igst_rate, igst_amount,
-                cgst_rate, cgst_amount, sgst_rate, sgst_amount,
-                total_taxes, invoice_total, eco_name, eco_gstin,
-                eco_fssai, eco_address, detail_pdf_url
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, %s, %s, %s, %s
-            )
-            ON CONFLICT (order_id) DO UPDATE SET
-                customer_id = EXCLUDED.customer_id,
-                invoice_no = EXCLUDED.invoice_no,
-                document_type = EXCLUDED.document_type,
-                date_of_invoice = EXCLUDED.date_of_invoice,
-                hsn_code = EXCLUDED.hsn_code,
-                service_description = EXCLUDED.service_description,
-                category = EXCLUDED.category,
-                reverse_charges = EXCLUDED.reverse_charges,
-                restaurant_name = EXCLUDED.restaurant_name,
-                restaurant_gstin = EXCLUDED.restaurant_gstin,
-                restaurant_fssai = EXCLUDED.restaurant_fssai,
-                restaurant_address = EXCLUDED.restaurant_address,
-                restaurant_state = EXCLUDED.restaurant_state,
-                place_of_supply = EXCLUDED.place_of_supply,
-                subtotal = EXCLUDED.subtotal,
-                igst_rate = EXCLUDED.igst_rate,
-                igst_amount = EXCLUDED.igst_amount,
-                cgst_rate = EXCLUDED.cgst_rate,
-                cgst_amount = EXCLUDED.cgst_amount,
-                sgst_rate = EXCLUDED.sgst_rate,
-                sgst_amount = EXCLUDED.sgst_amount,
-                total_taxes = EXCLUDED.total_taxes,
-                invoice_total = EXCLUDED.invoice_total,
-                eco_name = EXCLUDED.eco_name,
-                eco_gstin = EXCLUDED.eco_gstin,
-                eco_fssai = EXCLUDED.eco_fssai,
-                eco_address = EXCLUDED.eco_address,
-                detail_pdf_url = EXCLUDED.detail_pdf_url,
-                updated_at = NOW()
-            """,
+            FOOD_ORDER_UPSERT_SQL,
             (
                 order_id, customer_id, inv.invoice_no, inv.document_type,
-                validate_date(inv.date_of_invoice, "food order"), inv.hsn_code,
+                inv_date, inv.hsn_code,
                 inv.service_description, inv.category, inv.reverse_charges,
                 inv.restaurant_name, inv.restaurant_gstin, inv.restaurant_fssai,
                 inv.restaurant_address, inv.restaurant_state, inv.place_of_supply,
@@ -89,149 +330,65 @@ def upsert_food_order(conn, inv, customer_id: int, detail_url: str):
             ),
         )
 
-        # Delete + reinsert items
-        cur.execute("DELETE FROM food_order_items WHERE order_id = %s", (order_id,))
-        for item in inv.items:
-            cur.execute(
-                """
-                INSERT INTO food_order_items (
-                    order_id, sr_no, description, unit_of_measure,
-                    quantity, unit_price, amount, discount, net_assessable_value
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                """,
-                (
-                    order_id, item.sr_no, item.description, item.unit_of_measure,
-                    item.quantity, item.unit_price, item.amount,
-                    item.discount, item.net_assessable_value,
-                ),
-            )
+        cur.execute(FOOD_ITEMS_DELETE_SQL, (order_id,))
+
+    # Reinsert items via COPY into the UNLOGGED stage: server-side
+    # tuple parsing, no per-row parse/plan, no WAL, one round-trip.
+    if inv.items:
+        with cur.copy(FOOD_ITEMS_COPY_SQL) as cp:
+            cp.set_types(FOOD_ITEMS_COPY_TYPES)
+            for item in inv.items:
+                cp.write_row(_food_item_row(order_id, item))
 
 
-def upsert_instamart_order(conn, inv, customer_id: int, detail_url: str):
-    """Upsert an instamart order, its items, and handling fee."""
+def upsert_instamart_order(cur, inv, customer_id: int, detail_url: str):
+    """Upsert an instamart order, its items, and handling fee.
+
+    Takes a cursor rather than a connection; see upsert_food_order.
+    """
     validate_order_id(inv.order_id, "instamart order")
     order_id = int(inv.order_id)
+    # Validate up front so no CPU-bound work runs while the cursor is held
+    inv_date = validate_date(inv.date_of_invoice, "instamart order")
+    hf = inv.handling_fee
+    hf_date = validate_date(hf.date_of_invoice, "handling fee") if hf else None
 
-    with conn.cursor() as cur:
+    # Pipelined statements first, then COPY for the item batch (COPY
+    # is not allowed inside a pipeline).
+    with cur.connection.pipeline():
         cur.execute(
-            """
-            INSERT INTO instamart_orders (
-                order_id, customer_id, invoice_no, document_type,
-                date_of_invoice, category, seller_name, seller_gstin,
-                seller_fssai, seller_address, seller_city, seller_state,
-                place_of_supply, invoice_value, detail_pdf_url
-            ) VALUES (
-                %s, %s, %s, %s, %s, %s, %s, %s,
-                %s, %s, %s, %s, %s, %s, %s
-            )
-            ON CONFLICT (order_id) DO UPDATE SET
-                customer_id = EXCLUDED.customer_id,
-                invoice_no = EXCLUDED.invoice_no,
-                document_type = EXCLUDED.document_type,
-                date_of_invoice = EXCLUDED.date_of_invoice,
-                category = EXCLUDED.category,
-                seller_name = EXCLUDED.seller_name,
-                seller_gstin = EXCLUDED.seller_gstin,
-                seller_fssai = EXCLUDED.seller_fssai,
-                seller_address = EXCLUDED.seller_address,
-                seller_city = EXCLUDED.seller_city,
-                seller_state = EXCLUDED.seller_state,
-                place_of_supply = EXCLUDED.place_of_supply,
-                invoice_value = EXCLUDED.invoice_value,
-                detail_pdf_url = EXCLUDED.detail_pdf_url,
-                updated_at = NOW()
-            """,
+            INSTAMART_ORDER_UPSERT_SQL,
             (
                 order_id, customer_id, inv.invoice_no, inv.document_type,
-                validate_date(inv.date_of_invoice, "instamart order"), inv.category,
+                inv_date, inv.category,
                 inv.seller_name, inv.seller_gstin, inv.seller_fssai,
                 inv.seller_address, inv.seller_city, inv.seller_state,
                 inv.place_of_supply, inv.invoice_value, detail_url,
             ),
         )
 
-        # Delete + reinsert items
+        cur.execute(INSTAMART_ITEMS_DELETE_SQL, (order_id,))
+
+    # Reinsert items via COPY (see upsert_food_order)
+    if inv.items:
+        with cur.copy(INSTAMART_ITEMS_COPY_SQL) as cp:
+            cp.set_types(INSTAMART_ITEMS_COPY_TYPES)
+            for item in inv.items:
+                cp.write_row(_instamart_item_row(order_id, item))
+
+    # Upsert handling fee
+    if hf:
         cur.execute(
-            "DELETE FROM instamart_order_items WHERE order_id = %s", (order_id,)
+            HANDLING_FEE_UPSERT_SQL,
+            (
+                order_id, hf.invoice_no, hf_date,
+                hf.hsn_code, hf.hsn_description, hf.category,
+                hf.transaction_type, hf.invoice_type, hf.reverse_charges,
+                hf.swiggy_pan, hf.swiggy_gstin, hf.swiggy_address,
+                hf.swiggy_pincode, hf.swiggy_state_code,
+                hf.description, hf.unit_price, hf.discount,
+                hf.net_assessable_value, hf.cgst_rate, hf.cgst_amount,
+                hf.sgst_rate, hf.sgst_amount, hf.state_cess_rate,
+                hf.state_cess_amount, hf.total_taxes, hf.invoice_total,
+            ),
         )
-        for item in inv.items:
-            cur.execute(
-                """
-                INSERT INTO instamart_order_items (
-                    order_id, sr_no, description, quantity, uqc,
-                    hsn_sac_code, taxable_value, discount, net_taxable_value,
-                    cgst_rate, cgst_amount, sgst_rate, sgst_amount,
-                    cess_rate, cess_amount, additional_cess, total_amount
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s
-                )
-                """,
-                (
-                    order_id, item.sr_no, item.description, item.quantity,
-                    item.uqc, item.hsn_sac_code, item.taxable_value,
-                    item.discount, item.net_taxable_value,
-                    item.cgst_rate, item.cgst_amount,
-                    item.sgst_rate, item.sgst_amount,
-                    item.cess_rate, item.cess_amount,
-                    item.additional_cess, item.total_amount,
-                ),
-            )
-
-        # Upsert handling fee
-        if inv.handling_fee:
-            hf = inv.handling_fee
-            cur.execute(
-                """
-                INSERT INTO instamart_handling_fees (
-                    order_id, invoice_no, date_of_invoice, hsn_code,
-                    hsn_description, category, transaction_type, invoice_type,
-                    reverse_charges, swiggy_pan, swiggy_gstin, swiggy_address,
-                    swiggy_pincode, swiggy_state_code, description, unit_price,
-                    discount, net_assessable_value, cgst_rate, cgst_amount,
-                    sgst_rate, sgst_amount, state_cess_rate, state_cess_amount,
-                    total_taxes, invoice_total
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                    %s, %s, %s, %s, %s, %s
-                )
-                ON CONFLICT (order_id) DO UPDATE SET
-                    invoice_no = EXCLUDED.invoice_no,
-                    date_of_invoice = EXCLUDED.date_of_invoice,
-                    hsn_code = EXCLUDED.hsn_code,
-                    hsn_description = EXCLUDED.hsn_description,
-                    category = EXCLUDED.category,
-                    transaction_type = EXCLUDED.transaction_type,
-                    invoice_type = EXCLUDED.invoice_type,
-                    reverse_charges = EXCLUDED.reverse_charges,
-                    swiggy_pan = EXCLUDED.swiggy_pan,
-                    swiggy_gstin = EXCLUDED.swiggy_gstin,
-                    swiggy_address = EXCLUDED.swiggy_address,
-                    swiggy_pincode = EXCLUDED.swiggy_pincode,
-                    swiggy_state_code = EXCLUDED.swiggy_state_code,
-                    description = EXCLUDED.description,
-                    unit_price = EXCLUDED.unit_price,
-                    discount = EXCLUDED.discount,
-                    net_assessable_value = EXCLUDED.net_assessable_value,
-                    cgst_rate = EXCLUDED.cgst_rate,
-                    cgst_amount = EXCLUDED.cgst_amount,
-                    sgst_rate = EXCLUDED.sgst_rate,
-                    sgst_amount = EXCLUDED.sgst_amount,
-                    state_cess_rate = EXCLUDED.state_cess_rate,
-                    state_cess_amount = EXCLUDED.state_cess_amount,
-                    total_taxes = EXCLUDED.total_taxes,
-                    invoice_total = EXCLUDED.invoice_total
-                """,
-                (
-                    order_id, hf.invoice_no, validate_date(hf.date_of_invoice, "handling fee"),
-                    hf.hsn_code, hf.hsn_description, hf.category,
-                    hf.transaction_type, hf.invoice_type, hf.reverse_charges,
-                    hf.swiggy_pan, hf.swiggy_gstin, hf.swiggy_address,
-                    hf.swiggy_pincode, hf.swiggy_state_code,
-                    hf.description, hf.unit_price, hf.discount,
-                    hf.net_assessable_value, hf.cgst_rate, hf.cgst_amount,
-                    hf.sgst_rate, hf.sgst_amount, hf.state_cess_rate,
-                    hf.state_cess_amount, hf.total_taxes, hf.invoice_total,
-                ),
-            )
@@ -1,26 +1,64 @@
 """SwiggyIt CLI - Parse Swiggy/Instamart PDFs and load into PostgreSQL."""
 
 import argparse
+import asyncio
+import hashlib
+import logging
+import logging.handlers
 import os
+import pickle
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import psycopg
 
-from downloader import download_detail_pdfs
-from loader import upsert_customer, upsert_food_order, upsert_instamart_order
-from parser.food_parser import parse_food_detail
-from parser.instamart_parser import parse_instamart_detail
+from downloader import download_detail_pdfs, make_client
+from loader import (
+    ensure_item_staging,
+    ensure_schema,
+    flush_item_staging,
+    upsert_customer,
+    upsert_food_order,
+    upsert_instamart_order,
+)
+from parser.food_parser import parse_food_detail_bytes
+from parser.instamart_parser import parse_instamart_detail_bytes
+from parser import summary_parser
 from parser.summary_parser import parse_summary
 from validator import (
     ValidationError,
     validate_email,
     validate_invoice_fields,
+    validate_pdf_bytes,
     validate_pdf_file,
     validate_summary_counts,
     validate_summary_folder,
 )
 
+log = logging.getLogger("swiggyit")
+
+
+def setup_logging() -> None:
+    """Buffer per-order log lines and write them in one batch.
+
+    The hot loops emit up to three lines per order; a MemoryHandler
+    coalesces those stdout write syscalls into one flush per summary.
+    """
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(logging.Formatter("%(message)s"))
+    memory = logging.handlers.MemoryHandler(
+        capacity=1000, flushLevel=logging.ERROR, target=stream
+    )
+    log.addHandler(memory)
+    log.setLevel(logging.INFO)
+
+
+def flush_logging() -> None:
+    """Flush buffered log lines (called once per summary)."""
+    for handler in log.handlers:
+        handler.flush()
+
 
 def get_db_url() -> str:
     """Build PostgreSQL connection URL from environment or defaults."""
@@ -32,33 +70,107 @@ def get_db_url() -> str:
     return f"postgresql://{user}:{password}@{host}:{port}/{db}"
 
 
-def process_food(input_dir: Path, tmp_dir: Path, conn):
+# The parser source is folded into the cache key so pickles written by
+# an older summary_parser (renamed fields, slots changes, new defaults)
+# miss instead of loading as stale objects.
+_SUMMARY_PARSER_HASH = hashlib.blake2b(
+    Path(summary_parser.__file__).read_bytes(), digest_size=8
+).digest()
+
+
+def cached_parse_summary(pdf_path: Path, tmp_dir: Path):
+    """parse_summary memoized by PDF content hash under .tmp/summary_cache/.
+
+    Hashing the bytes is far cheaper than a PyMuPDF parse, so repeat runs
+    over an unchanged summary cost a hash + unpickle. The key also covers
+    the summary_parser source (see _SUMMARY_PARSER_HASH).
+    """
+    digest = hashlib.blake2b(
+        _SUMMARY_PARSER_HASH + pdf_path.read_bytes(), digest_size=16
+    ).hexdigest()
+    cache_path = tmp_dir / "summary_cache" / f"{digest}.pkl"
+    if cache_path.exists():
+        return pickle.loads(cache_path.read_bytes())
+    summary = parse_summary(pdf_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_bytes(pickle.dumps(summary))
+    return summary
+
+
+def _find_summaries(folder: Path, prefix: str) -> list[Path]:
+    """Find summary PDFs via os.scandir (no extra stat per entry)."""
+    if not folder.is_dir():
+        return []
+    return sorted(
+        Path(entry.path)
+        for entry in os.scandir(folder)
+        if entry.name.startswith(prefix)
+        and entry.name.endswith(".pdf")
+        and entry.is_file(follow_symlinks=False)
+    )
+
+
+def _parse_food_checked(path: Path):
+    """Pool worker: read the PDF once, validate the bytes, parse from memory."""
+    data = path.read_bytes()
+    try:
+        validate_pdf_bytes(data, path.name)
+    except ValidationError as e:
+        print(f"  Skipping: {e}")
+        return None
+    return parse_food_detail_bytes(data, path.name)
+
+
+def _parse_instamart_checked(path: Path):
+    """Pool worker: read the PDF once, validate the bytes, parse from memory."""
+    data = path.read_bytes()
+    try:
+        validate_pdf_bytes(data, path.name)
+    except ValidationError as e:
+        print(f"  Skipping: {e}")
+        return None
+    return parse_instamart_detail_bytes(data, path.name)
+
+
+def _already_loaded_ids(conn, table: str, orders: list) -> set[int]:
+    """Return order_ids from `orders` that already exist in `table`."""
+    ids = [int(o.order_id) for o in orders if o.order_id.isdigit()]
+    if not ids:
+        return set()
+    with conn.cursor() as cur:
+        cur.execute(
+            f"SELECT order_id FROM {table} WHERE order_id = ANY(%s)", (ids,)
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+async def process_food(input_dir: Path, tmp_dir: Path, conn, client, force: bool = False):
     """Process all food summary PDFs."""
     food_dir = input_dir / "food"
-    pdfs = list(food_dir.glob("order_summary_food_*.pdf"))
+    pdfs = _find_summaries(food_dir, "order_summary_food_")
     if not pdfs:
-        print("No food summary PDFs found in input/food/")
+        log.info("No food summary PDFs found in input/food/")
         return
 
     for pdf_path in pdfs:
-        print(f"\n[Food] Parsing summary: {pdf_path.name}")
+        log.info(f"\n[Food] Parsing summary: {pdf_path.name}")
 
         try:
             validate_pdf_file(pdf_path)
         except ValidationError as e:
-            print(f"  Skipping: {e}")
+            log.info(f"  Skipping: {e}")
             continue
 
-        summary = parse_summary(pdf_path)
+        summary = cached_parse_summary(pdf_path, tmp_dir)
 
         try:
             validate_summary_folder(pdf_path.parent.name, summary.order_type)
         except ValidationError as e:
-            print(f"  Skipping: {e}")
+            log.info(f"  Skipping: {e}")
             continue
 
-        print(f"  Customer: {summary.customer_name} ({summary.customer_email})")
-        print(f"  Orders: {summary.number_of_orders}")
+        log.info(f"  Customer: {summary.customer_name} ({summary.customer_email})")
+        log.info(f"  Orders: {summary.number_of_orders}")
         validate_email(summary.customer_email)
         validate_summary_counts(summary)
 
@@ -73,70 +185,98 @@ def process_food(input_dir: Path, tmp_dir: Path, conn):
         conn.commit()
 
         # Download detail PDFs
-        print("  Downloading detail PDFs...")
-        detail_files = download_detail_pdfs(summary.orders, "food", tmp_dir)
+        log.info("  Downloading detail PDFs...")
+        detail_files = await download_detail_pdfs(
+            summary.orders, "food", tmp_dir, client
+        )
 
-        # Parse details and load
+        # Skip orders that are already loaded (parsing is the expensive
+        # step; on re-runs this makes already-ingested orders ~free)
+        existing = set() if force else _already_loaded_ids(
+            conn, "food_orders", summary.orders
+        )
+
+        # Parse in parallel (CPU-bound and independent per PDF); each
+        # worker reads the file once and validates + parses those bytes
         loaded = 0
         failed = 0
+        skipped = 0
+        parse_orders = []
         for order in summary.orders:
-            detail_path = detail_files.get(order.order_id)
-            if not detail_path:
-                failed += 1
-                continue
-
-            try:
-                validate_pdf_file(detail_path)
-            except ValidationError as e:
-                print(f"  Skipping order {order.order_id}: {e}")
-                failed += 1
+            if int(order.order_id) in existing:
+                skipped += 1
                 continue
 
-            invoice = parse_food_detail(detail_path)
-            if not invoice or not invoice.order_id:
+            detail_path = detail_files.get(order.order_id)
+            if not detail_path:
                 failed += 1
                 continue
 
-            validate_invoice_fields(invoice, "food")
-
-            try:
-                upsert_food_order(conn, invoice, customer_id, order.detail_url)
-                loaded += 1
-            except ValidationError as e:
-                print(f"  Skipping order {order.order_id}: {e}")
-                failed += 1
-
+            parse_orders.append((order, detail_path))
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            invoices = list(ex.map(
+                _parse_food_checked,
+                [path for _, path in parse_orders],
+                chunksize=8,
+            ))
+
+        # Load sequentially on the main thread, which holds the connection;
+        # one cursor serves the whole summary instead of one per order
+        with conn.cursor() as cur:
+            for (order, _), invoice in zip(parse_orders, invoices):
+                if not invoice or not invoice.order_id:
+                    failed += 1
+                    continue
+
+                validate_invoice_fields(invoice, "food")
+
+                try:
+                    # Savepoint per order: a bad order rolls back alone
+                    # without losing the rest of the batch.
+                    with conn.transaction(savepoint_name=f"o{order.order_id}"):
+                        upsert_food_order(cur, invoice, customer_id, order.detail_url)
+                    loaded += 1
+                except ValidationError as e:
+                    log.info(f"  Skipping order {order.order_id}: {e}")
+                    failed += 1
+
+        flush_item_staging(conn)
         conn.commit()
-        print(f"  Loaded: {loaded}/{len(summary.orders)} orders ({failed} failed)")
+        log.info(
+            f"  Loaded: {loaded}/{len(summary.orders)} orders "
+            f"({skipped} already loaded, {failed} failed)"
+        )
+        flush_logging()
 
 
-def process_instamart(input_dir: Path, tmp_dir: Path, conn):
+async def process_instamart(input_dir: Path, tmp_dir: Path, conn, client, force: bool = False):
     """Process all instamart summary PDFs."""
     instamart_dir = input_dir / "instamart"
-    pdfs = list(instamart_dir.glob("order_summary_instamart_*.pdf"))
+    pdfs = _find_summaries(instamart_dir, "order_summary_instamart_")
     if not pdfs:
-        print("No instamart summary PDFs found in input/instamart/")
+        log.info("No instamart summary PDFs found in input/instamart/")
         return
 
     for pdf_path in pdfs:
-        print(f"\n[Instamart] Parsing summary: {pdf_path.name}")
+        log.info(f"\n[Instamart] Parsing summary: {pdf_path.name}")
 
         try:
             validate_pdf_file(pdf_path)
         except ValidationError as e:
-            print(f"  Skipping: {e}")
+            log.info(f"  Skipping: {e}")
             continue
 
-        summary = parse_summary(pdf_path)
+        summary = cached_parse_summary(pdf_path, tmp_dir)
 
         try:
             validate_summary_folder(pdf_path.parent.name, summary.order_type)
         except ValidationError as e:
-            print(f"  Skipping: {e}")
+            log.info(f"  Skipping: {e}")
             continue
 
-        print(f"  Customer: {summary.customer_name} ({summary.customer_email})")
-        print(f"  Orders: {summary.number_of_orders}")
+        log.info(f"  Customer: {summary.customer_name} ({summary.customer_email})")
+        log.info(f"  Orders: {summary.number_of_orders}")
         validate_email(summary.customer_email)
         validate_summary_counts(summary)
 
@@ -151,41 +291,80 @@ def process_instamart(input_dir: Path, tmp_dir: Path, conn):
         conn.commit()
 
         # Download detail PDFs
-        print("  Downloading detail PDFs...")
-        detail_files = download_detail_pdfs(summary.orders, "instamart", tmp_dir)
+        log.info("  Downloading detail PDFs...")
+        detail_files = await download_detail_pdfs(
+            summary.orders, "instamart", tmp_dir, client
+        )
+
+        # Skip orders that are already loaded (parsing is the expensive
+        # step; on re-runs this makes already-ingested orders ~free)
+        existing = set() if force else _already_loaded_ids(
+            conn, "instamart_orders", summary.orders
+        )
 
-        # Parse details and load
+        # Parse in parallel (CPU-bound and independent per PDF); each
+        # worker reads the file once and validates + parses those bytes
         loaded = 0
         failed = 0
+        skipped = 0
+        parse_orders = []
         for order in summary.orders:
-            detail_path = detail_files.get(order.order_id)
-            if not detail_path:
-                failed += 1
+            if int(order.order_id) in existing:
+                skipped += 1
                 continue
 
-            try:
-                validate_pdf_file(detail_path)
-            except ValidationError as e:
-                print(f"  Skipping order {order.order_id}: {e}")
+            detail_path = detail_files.get(order.order_id)
+            if not detail_path:
                 failed += 1
                 continue
 
-            invoice = parse_instamart_detail(detail_path)
-            if not invoice or not invoice.order_id:
-                failed += 1
-                continue
+            parse_orders.append((order, detail_path))
+
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+            invoices = list(ex.map(
+                _parse_instamart_checked,
+                [path for _, path in parse_orders],
+                chunksize=8,
+            ))
+
+        # Load sequentially on the main thread, which holds the connection;
+        # one cursor serves the whole summary instead of one per order
+        with conn.cursor() as cur:
+            for (order, _), invoice in zip(parse_orders, invoices):
+                if not invoice or not invoice.order_id:
+                    failed += 1
+                    continue
+
+                validate_invoice_fields(invoice, "instamart")
+
+                try:
+                    # Savepoint per order: a bad order rolls back alone
+                    # without losing the rest of the batch.
+                    with conn.transaction(savepoint_name=f"o{order.order_id}"):
+                        upsert_instamart_order(cur, invoice, customer_id, order.detail_url)
+                    loaded += 1
+                except ValidationError as e:
+                    log.info(f"  Skipping order {order.order_id}: {e}")
+                    failed += 1
+
+        flush_item_staging(conn)
+        conn.commit()
+        log.info(
+            f"  Loaded: {loaded}/{len(summary.orders)} orders "
+            f"({skipped} already loaded, {failed} failed)"
+        )
+        flush_logging()
 
-            validate_invoice_fields(invoice, "instamart")
 
-            try:
-                upsert_instamart_order(conn, invoice, customer_id, order.detail_url)
-                loaded += 1
-            except ValidationError as e:
-                print(f"  Skipping order {order.order_id}: {e}")
-                failed += 1
+async def run_pipelines(args, conn):
+    """Run both phases sharing one HTTP connection pool.
 
-        conn.commit()
-        print(f"  Loaded: {loaded}/{len(summary.orders)} orders ({failed} failed)")
+    One client means the instamart phase reuses the warm connections
+    (DNS + TLS already done) left over from the food phase.
+    """
+    async with make_client() as client:
+        await process_food(args.input, args.tmp, conn, client, force=args.force)
+        await process_instamart(args.input, args.tmp, conn, client, force=args.force)
 
 
 def main():
@@ -202,6 +381,11 @@ def main():
         default=Path(".tmp"),
         help="Temp directory for downloaded detail PDFs (default: .tmp)",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse and re-upsert orders that are already in the database",
+    )
     parser.add_argument(
         "--db-url",
         type=str,
@@ -210,6 +394,7 @@ def main():
     )
     args = parser.parse_args()
 
+    setup_logging()
     db_url = args.db_url or get_db_url()
 
     print("SwiggyIt - Swiggy Bill Parser")
@@ -218,7 +403,9 @@ def main():
     print(f"Temp dir:  {args.tmp.resolve()}")
 
     try:
-        conn = psycopg.connect(db_url, autocommit=False)
+        # prepare_threshold=0: server-side prepare on first use, so the big
+        # upsert statements skip parse/plan on every subsequent order.
+        conn = psycopg.connect(db_url, autocommit=False, prepare_threshold=0)
     except psycopg.OperationalError as e:
         print(f"\nFailed to connect to PostgreSQL: {e}")
         print("Make sure the database is running: docker compose up -d postgres")
@@ -226,12 +413,30 @@ def main():
 
     print(f"Database:  connected")
 
+    # Commits no longer wait for the WAL fsync. Safe trade-off here: a
+    # crash can lose the last transactions, but the PDFs on disk are the
+    # source of truth and the next run re-loads anything missing.
+    conn.execute("SET synchronous_commit = off")
+
+    # docker-entrypoint-initdb.d applies the schema on first container
+    # start; this covers non-docker databases and schema changes, and is
+    # a single SELECT when nothing changed.
+    schema_path = Path(__file__).resolve().parent.parent / "sql" / "schema.sql"
+    schema_applied = False
+    if schema_path.exists():
+        schema_applied = ensure_schema(conn, schema_path)
+
+    # Rebuild the stages after a schema change so they match the new
+    # table shape
+    ensure_item_staging(conn, recreate=schema_applied)
+
     try:
-        process_food(args.input, args.tmp, conn)
-        process_instamart(args.input, args.tmp, conn)
+        asyncio.run(run_pipelines(args, conn))
+        flush_logging()
         print("\nDone!")
     except Exception as e:
         conn.rollback()
+        flush_logging()
         print(f"\nError: {e}")
         raise
     finally:
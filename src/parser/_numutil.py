@@ -0,0 +1,28 @@
+"""Shared numeric-cell parsing for the PDF parsers."""
+
+# One translate pass strips currency symbols, thousands separators and
+# spaces in a single new string; the two-replace + strip form it
+# replaces allocated up to four.
+_NUM_TBL = str.maketrans("", "", ",₹ ")
+
+
+def parse_float(val: str | None) -> float:
+    """Parse a numeric cell like '₹1,774.50'; empty/invalid become 0.0."""
+    if not val:
+        return 0.0
+    # Most cells are plain numbers that float() takes directly (it
+    # already tolerates surrounding whitespace); only cells carrying a
+    # currency symbol or thousands separator pay for the translate copy.
+    try:
+        return float(val)
+    except ValueError:
+        pass
+    try:
+        return float(val.translate(_NUM_TBL))
+    except ValueError:
+        return 0.0
+
+
+def parse_amount(text: str) -> float:
+    """Parse an amount like '₹1,774.50'; raises ValueError when invalid."""
+    return float(text.translate(_NUM_TBL))
@@ -5,14 +5,20 @@ Each PDF contains 2 invoices:
   Page 2: Swiggy handling fee invoice
 """
 
+import io
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from sys import intern
 from dataclasses import dataclass, field
 from pathlib import Path
 
 import pdfplumber
 
+from parser._numutil import parse_float as _pf
 
-@dataclass
+
+@dataclass(slots=True)
 class InstamartItem:
     sr_no: int
     description: str
@@ -32,7 +38,7 @@ class InstamartItem:
     total_amount: float
 
 
-@dataclass
+@dataclass(slots=True)
 class HandlingFee:
     invoice_no: str
     date_of_invoice: str
@@ -61,7 +67,7 @@ class HandlingFee:
     invoice_total: float
 
 
-@dataclass
+@dataclass(slots=True)
 class InstamartInvoice:
     # Invoice metadata
     order_id: str
@@ -96,180 +102,310 @@ class InstamartInvoice:
     handling_fee: HandlingFee | None = None
 
 
-def _pf(val: str) -> float:
-    """Parse float from string."""
-    if not val:
-        return 0.0
-    cleaned = val.replace(",", "").replace("₹", "").strip()
-    try:
-        return float(cleaned)
-    except ValueError:
-        return 0.0
+# Field patterns compiled once at import (see food_parser): avoids the
+# re-cache lookup per call and any recompilation on cache eviction.
+
+# Single-line header fields fused into one alternation per header (see
+# food_parser): one finditer pass instead of a full-text scan per field.
+_SELLER_FUSED_RE = re.compile(
+    r"Order ID:\s*(?P<order_id>\d+)"
+    r"|Document:\s*(?P<document_type>\S+)"
+    r"|Invoice No:\s*(?P<invoice_no>\S+)"
+    r"|Date of Invoice:\s*(?P<date_of_invoice>\d{2}-\d{2}-\d{4})"
+    r"|Category:\s*(?P<category>\S+)"
+    r"|^GSTIN:\s*(?P<customer_gstin>\S+)"
+    r"|Seller Name:\s*(?P<seller_name>.+?)$"
+    r"|Seller GSTIN:\s*(?P<seller_gstin>\S+)"
+    r"|FSSAI:\s*(?P<seller_fssai>\S+)"
+    r"|City:\s*(?P<seller_city>.+?)$"
+    r"|State:\s*(?P<seller_state>.+?)$"
+    r"|Place of Supply:\s*(?P<place_of_supply>.+?)$",
+    re.MULTILINE,
+)
+
+_SELLER_DEFAULTS = {
+    "customer_name": "", "customer_gstin": "", "customer_address": "",
+    "order_id": "", "document_type": "INV", "invoice_no": "",
+    "date_of_invoice": "", "category": "",
+    "seller_name": "", "seller_gstin": "", "seller_fssai": "",
+    "seller_address": "", "seller_city": "", "seller_state": "",
+    "place_of_supply": "",
+}
+
+_HANDLING_FUSED_RE = re.compile(
+    r"PAN:\s*(?P<swiggy_pan>\S+)"
+    r"|^GSTIN:\s*(?P<swiggy_gstin>\S+)"
+    r"|Pincode:\s*(?P<swiggy_pincode>\S+)"
+    r"|State Code:\s*(?P<swiggy_state_code>\S+)"
+    r"|Invoice No:\s*(?P<invoice_no>\S+)"
+    r"|Date of Invoice:\s*(?P<date_of_invoice>\d{2}-\d{2}-\d{4})"
+    r"|Category:\s*(?P<category>\S+)"
+    r"|Transaction Type:\s*(?P<transaction_type>\S+)"
+    r"|Invoice Type:\s*(?P<invoice_type>\S+)"
+    r"|Whether Reverse Charges\s*(?P<reverse_charges>\S+)",
+    re.MULTILINE,
+)
+
+_HANDLING_DEFAULTS = {
+    "swiggy_pan": "", "swiggy_gstin": "", "swiggy_address": "",
+    "swiggy_pincode": "", "swiggy_state_code": "",
+    "invoice_no": "", "date_of_invoice": "", "category": "",
+    "transaction_type": "", "invoice_type": "", "reverse_charges": "No",
+}
+
+# Bleed-sensitive multi-line fields keep dedicated patterns
+_RE_CUSTOMER_NAME = re.compile(r"Invoice To:\s*(.+?)(?:\s{2,}Seller Name)")
+_RE_CUSTOMER_ADDRESS = re.compile(r"Customer Address:\s*(.+?)(?:\s{2,}FSSAI)")
+# [^\n]-anchored forms of the old lazy-DOTALL patterns: every line is
+# consumed exactly one way, so a missing stop label fails fast instead
+# of backtracking quadratically (see _RE_RESTAURANT_ADDRESS in
+# food_parser).
+_RE_SELLER_ADDRESS = re.compile(
+    r"Order ID:[^\n]*\n"
+    r"(?:(?!Address:)[^\n]*\n)*"
+    r"Address:[ \t]*([^\n]*(?:\n(?!Document:)[^\n]*)*)"
+    r"(?=\nDocument:)"
+)
+_RE_SELLER_ADDRESS_ALT = re.compile(
+    r"Address:[ \t]*([^\n]*(?:\n(?!City:|Document:)[^\n]*)*)"
+    r"(?=\n(?:City:|Document:))"
+)
+_RE_SWIGGY_ADDRESS = re.compile(
+    r"GSTIN:[^\n]*\n"
+    r"(?:(?!Address:)[^\n]*\n)*"
+    r"Address:[ \t]*([^\n]*(?:\n(?!Pincode:)[^\n]*)*)"
+    r"(?=\nPincode:)"
+)
+
+# Text-mode fast path for the page 1 item table (see food_parser): one
+# line regex with the 16 fixed columns replaces extract_tables(). The
+# handling-fee page keeps table extraction -- its column count varies.
+_IM_ITEM_TEXT_RE = re.compile(
+    r"^(\d+)\.?\s+(.+?)\s+(\d+)\s+(\S+)\s+(\S+)"
+    r"\s+([\d,.]+)\s+([\d,.]+)\s+([\d,.]+)"
+    r"\s+([\d,.]+)\s+([\d,.]+)\s+([\d,.]+)\s+([\d,.]+)"
+    r"\s+([\d,.]+)\s+([\d,.]+)\s+([\d,.]+)\s+([\d,.]+)\s*$",
+    re.MULTILINE,
+)
+_IM_INVOICE_VALUE_RE = re.compile(r"^Invoice Value\s+₹?([\d,.]+)\s*$", re.MULTILINE)
+
+# Serial-number cell matcher shared by the table-path row loops (see
+# food_parser._SR_NO_RE)
+_SR_NO_RE = re.compile(r"^\s*(\d+)\.?\s*$")
+
+# Whitespace-run collapser (see food_parser._WS_RE)
+_WS_RE = re.compile(r"\s+")
+
+# Handling fee tax block, fused into one alternation (see
+# _parse_tax_block in food_parser): one finditer pass replaces six
+# independent searches. lastgroup names the branch that matched.
+_HANDLING_TAX_FUSED_RE = re.compile(
+    r"CGST\s+(?P<cgst_rate>[\d.]+)%\s+(?P<cgst_amount>[\d,.]+)"
+    r"|SGST/UTGST\s+(?P<sgst_rate>[\d.]+)%\s+(?P<sgst_amount>[\d,.]+)"
+    r"|State CESS\s+(?P<state_cess_rate>[\d.]+)%\s+(?P<state_cess_amount>[\d,.]+)"
+    r"|Total taxes\s+(?P<total_taxes>[\d,.]+)"
+    r"|Invoice Total\s+(?P<invoice_total>[\d,.]+)"
+    r"|(?P<hsn_code>\d{6})\s+(?P<hsn_description>.+?)(?:\n|Total taxes)"
+)
 
 
 def _parse_seller_header(text: str) -> dict:
     """Parse page 1 header (seller invoice metadata)."""
-    d = {}
-
-    m = re.search(r"Invoice To:\s*(.+?)(?:\s{2,}Seller Name)", text)
-    d["customer_name"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"^GSTIN:\s*(\S+)", text, re.MULTILINE)
-    d["customer_gstin"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Customer Address:\s*(.+?)(?:\s{2,}FSSAI)", text)
-    d["customer_address"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Order ID:\s*(\d+)", text)
-    d["order_id"] = m.group(1).strip() if m else ""
+    d = dict(_SELLER_DEFAULTS)
 
-    m = re.search(r"Document:\s*(\S+)", text)
-    d["document_type"] = m.group(1).strip() if m else "INV"
+    # setdefault keeps first-occurrence-wins, matching re.search semantics
+    found = {}
+    for m in _SELLER_FUSED_RE.finditer(text):
+        found.setdefault(m.lastgroup, m.group(m.lastgroup))
+    for key, val in found.items():
+        d[key] = val.strip()
 
-    m = re.search(r"Invoice No:\s*(\S+)", text)
-    d["invoice_no"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Date of Invoice:\s*(\d{2}-\d{2}-\d{4})", text)
-    d["date_of_invoice"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Category:\s*(\S+)", text)
-    d["category"] = m.group(1).strip() if m else ""
-
-    # Right column
-    m = re.search(r"Seller Name:\s*(.+?)$", text, re.MULTILINE)
-    d["seller_name"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Seller GSTIN:\s*(\S+)", text)
-    d["seller_gstin"] = m.group(1).strip() if m else ""
+    m = _RE_CUSTOMER_NAME.search(text)
+    if m:
+        d["customer_name"] = m.group(1).strip()
 
-    m = re.search(r"FSSAI:\s*(\S+)", text)
-    d["seller_fssai"] = m.group(1).strip() if m else ""
+    m = _RE_CUSTOMER_ADDRESS.search(text)
+    if m:
+        d["customer_address"] = m.group(1).strip()
 
     # Seller address: after "Address:" on right side (after Order ID line)
-    m = re.search(r"Order ID:.*?\nAddress:\s*(.+?)(?=\nDocument:)", text, re.DOTALL)
+    m = _RE_SELLER_ADDRESS.search(text)
     if not m:
-        m = re.search(r"Address:\s*(.+?)(?=\nCity:|\nDocument:)", text, re.DOTALL)
-    d["seller_address"] = " ".join(m.group(1).split()) if m else ""
-
-    m = re.search(r"City:\s*(.+?)$", text, re.MULTILINE)
-    d["seller_city"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"State:\s*(.+?)$", text, re.MULTILINE)
-    d["seller_state"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Place of Supply:\s*(.+?)$", text, re.MULTILINE)
-    d["place_of_supply"] = m.group(1).strip() if m else ""
+        m = _RE_SELLER_ADDRESS_ALT.search(text)
+    if m:
+        d["seller_address"] = _WS_RE.sub(" ", m.group(1)).strip()
 
+    # Finalized here so the dict **-unpacks into InstamartInvoice
+    d["document_type"] = intern(d["document_type"])
+    d["category"] = intern(d["category"])
     return d
 
 
 def _parse_handling_header(text: str) -> dict:
     """Parse page 2 header (handling fee invoice metadata)."""
-    d = {}
-
-    m = re.search(r"PAN:\s*(\S+)", text)
-    d["swiggy_pan"] = m.group(1).strip() if m else ""
+    d = dict(_HANDLING_DEFAULTS)
 
-    m = re.search(r"^GSTIN:\s*(\S+)", text, re.MULTILINE)
-    d["swiggy_gstin"] = m.group(1).strip() if m else ""
+    found = {}
+    for m in _HANDLING_FUSED_RE.finditer(text):
+        found.setdefault(m.lastgroup, m.group(m.lastgroup))
+    for key, val in found.items():
+        d[key] = val.strip()
 
     # Swiggy address: after their GSTIN line
-    m = re.search(r"GSTIN:.*?\nAddress:\s*(.+?)(?=\nPincode:)", text, re.DOTALL)
-    d["swiggy_address"] = " ".join(m.group(1).split()) if m else ""
-
-    m = re.search(r"Pincode:\s*(\S+)", text)
-    d["swiggy_pincode"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"State Code:\s*(\S+)", text)
-    d["swiggy_state_code"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Invoice No:\s*(\S+)", text)
-    d["invoice_no"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Date of Invoice:\s*(\d{2}-\d{2}-\d{4})", text)
-    d["date_of_invoice"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Category:\s*(\S+)", text)
-    d["category"] = m.group(1).strip() if m else ""
-
-    m = re.search(r"Transaction Type:\s*(\S+)", text)
-    d["transaction_type"] = m.group(1).strip() if m else ""
+    m = _RE_SWIGGY_ADDRESS.search(text)
+    if m:
+        d["swiggy_address"] = _WS_RE.sub(" ", m.group(1)).strip()
 
-    m = re.search(r"Invoice Type:\s*(\S+)", text)
-    d["invoice_type"] = m.group(1).strip() if m else ""
+    # Finalized here so the dict **-unpacks into HandlingFee
+    d["reverse_charges"] = d["reverse_charges"].lower() == "yes"
+    d["category"] = intern(d["category"])
+    return d
 
-    m = re.search(r"Whether Reverse Charges\s*(\S+)", text)
-    d["reverse_charges"] = m.group(1).strip() if m else "No"
 
-    return d
+_HANDLING_TAX_DEFAULTS = {
+    "hsn_code": "", "hsn_description": "",
+    "cgst_rate": 0.0, "cgst_amount": 0.0,
+    "sgst_rate": 0.0, "sgst_amount": 0.0,
+    "state_cess_rate": 0.0, "state_cess_amount": 0.0,
+    "total_taxes": 0.0, "invoice_total": 0.0,
+}
 
 
 def _parse_handling_tax(tax_text: str) -> dict:
     """Parse tax block from page 2 handling fee invoice."""
-    taxes = {}
+    taxes = dict(_HANDLING_TAX_DEFAULTS)
+
+    # setdefault keeps first-occurrence-wins, matching re.search semantics
+    found = {}
+    for m in _HANDLING_TAX_FUSED_RE.finditer(tax_text):
+        found.setdefault(m.lastgroup, m)
 
-    m = re.search(r"CGST\s+([\d.]+)%\s+([\d,.]+)", tax_text)
+    m = found.get("cgst_amount")
     if m:
-        taxes["cgst_rate"] = float(m.group(1))
-        taxes["cgst_amount"] = _pf(m.group(2))
+        taxes["cgst_rate"] = float(m.group("cgst_rate"))
+        taxes["cgst_amount"] = _pf(m.group("cgst_amount"))
 
-    m = re.search(r"SGST/UTGST\s+([\d.]+)%\s+([\d,.]+)", tax_text)
+    m = found.get("sgst_amount")
     if m:
-        taxes["sgst_rate"] = float(m.group(1))
-        taxes["sgst_amount"] = _pf(m.group(2))
+        taxes["sgst_rate"] = float(m.group("sgst_rate"))
+        taxes["sgst_amount"] = _pf(m.group("sgst_amount"))
 
-    m = re.search(r"State CESS\s+([\d.]+)%\s+([\d,.]+)", tax_text)
+    m = found.get("state_cess_amount")
     if m:
-        taxes["state_cess_rate"] = float(m.group(1))
-        taxes["state_cess_amount"] = _pf(m.group(2))
+        taxes["state_cess_rate"] = float(m.group("state_cess_rate"))
+        taxes["state_cess_amount"] = _pf(m.group("state_cess_amount"))
 
-    m = re.search(r"Total taxes\s+([\d,.]+)", tax_text)
-    taxes["total_taxes"] = _pf(m.group(1)) if m else 0.0
+    m = found.get("total_taxes")
+    if m:
+        taxes["total_taxes"] = _pf(m.group("total_taxes"))
 
-    m = re.search(r"Invoice Total\s+([\d,.]+)", tax_text)
-    taxes["invoice_total"] = _pf(m.group(1)) if m else 0.0
+    m = found.get("invoice_total")
+    if m:
+        taxes["invoice_total"] = _pf(m.group("invoice_total"))
 
     # HSN info
-    m = re.search(r"(\d{6})\s+(.+?)(?:\n|Total taxes)", tax_text)
+    m = found.get("hsn_description")
     if m:
-        taxes["hsn_code"] = m.group(1).strip()
-        taxes["hsn_description"] = m.group(2).strip()
+        taxes["hsn_code"] = m.group("hsn_code").strip()
+        taxes["hsn_description"] = m.group("hsn_description").strip()
 
     return taxes
 
 
 def parse_instamart_detail(file_path: Path) -> InstamartInvoice | None:
     """Parse an instamart detail invoice PDF and return structured data."""
+    file_path = Path(file_path)
+    return parse_instamart_detail_bytes(file_path.read_bytes(), file_path.name)
+
+
+def parse_instamart_detail_bytes(data: bytes, name: str) -> InstamartInvoice | None:
+    """Parse an instamart detail invoice from in-memory PDF bytes.
+
+    Callers that already hold the bytes (e.g. after validating the
+    magic prefix) avoid a second read of the file.
+    """
     try:
-        pdf = pdfplumber.open(str(file_path))
+        # Seller invoice on page 1, handling fee on page 2; pages= keeps
+        # pdfplumber from analyzing anything beyond those.
+        pdf = pdfplumber.open(io.BytesIO(data), pages=[1, 2])
     except Exception as e:
-        print(f"  Failed to open {file_path.name}: {e}")
+        print(f"  Failed to open {name}: {e}")
         return None
 
     try:
         # ---- PAGE 1: Seller / Product Invoice ----
         page1 = pdf.pages[0]
-        table1 = page1.extract_tables()[0]
-
-        # Row 1: merged header
-        header = _parse_seller_header(table1[1][0] or "")
-
-        # Rows 3+: item rows (row 2 is column headers)
-        items = []
-        invoice_value = 0.0
-        for row in table1[3:]:
-            if row[0] and "Invoice Value" in row[0]:
-                invoice_value = _pf(row[-1])
-                continue
-            if row[0] and "Amount in words" in row[0]:
-                continue
-            if row[0] and row[0].strip().rstrip(".").isdigit():
+
+        # Cheap text sweep first; table extraction only when the fixed
+        # column layout doesn't line up in the text.
+        text1 = page1.extract_text() or ""
+        value_m = _IM_INVOICE_VALUE_RE.search(text1)
+        items = [
+            InstamartItem(
+                sr_no=int(m.group(1)),
+                description=_WS_RE.sub(" ", m.group(2)).strip(),
+                quantity=int(m.group(3)),
+                uqc=intern(m.group(4)),
+                hsn_sac_code=intern(m.group(5)),
+                taxable_value=_pf(m.group(6)),
+                discount=_pf(m.group(7)),
+                net_taxable_value=_pf(m.group(8)),
+                cgst_rate=_pf(m.group(9)),
+                cgst_amount=_pf(m.group(10)),
+                sgst_rate=_pf(m.group(11)),
+                sgst_amount=_pf(m.group(12)),
+                cess_rate=_pf(m.group(13)),
+                cess_amount=_pf(m.group(14)),
+                additional_cess=_pf(m.group(15)),
+                total_amount=_pf(m.group(16)),
+            )
+            for m in _IM_ITEM_TEXT_RE.finditer(
+                text1[: value_m.start()] if value_m else text1
+            )
+        ]
+
+        # Commit to the text path only when the header parsed too: an
+        # invoice without an order_id is counted failed downstream even
+        # though the table path could still parse it. The name/address
+        # patterns depend on the column gap surviving extract_text() as
+        # runs of spaces, so treat an empty match there as a miss as
+        # well instead of loading blank customer/seller rows.
+        header = None
+        if items and value_m:
+            header = _parse_seller_header(text1)
+            if (
+                header["order_id"]
+                and header["customer_name"]
+                and header["customer_address"]
+                and header["seller_address"]
+            ):
+                invoice_value = _pf(value_m.group(1))
+            else:
+                header = None
+        if header is None:
+            table1 = page1.extract_tables()[0]
+
+            # Row 1: merged header
+            header = _parse_seller_header(table1[1][0] or "")
+
+            # Rows 3+: item rows (row 2 is column headers)
+            items = []
+            invoice_value = 0.0
+            for row in table1[3:]:
+                c0 = row[0]
+                if not c0:
+                    continue
+                sr_m = _SR_NO_RE.match(c0)
+                if sr_m is None:
+                    if "Invoice Value" in c0:
+                        invoice_value = _pf(row[-1])
+                    continue
                 items.append(InstamartItem(
-                    sr_no=int(row[0].strip().rstrip(".")),
-                    description=" ".join((row[1] or "").split()),
+                    sr_no=int(sr_m.group(1)),
+                    description=_WS_RE.sub(" ", row[1] or "").strip(),
                     quantity=int(row[2].strip()) if row[2] else 0,
-                    uqc=(row[3] or "").strip(),
-                    hsn_sac_code=(row[4] or "").strip(),
+                    uqc=intern((row[3] or "").strip()),
+                    hsn_sac_code=intern((row[4] or "").strip()),
                     taxable_value=_pf(row[5]),
                     discount=_pf(row[6]),
                     net_taxable_value=_pf(row[7]),
@@ -293,23 +429,25 @@ def parse_instamart_detail(file_path: Path) -> InstamartInvoice | None:
             # Row 2: merged header
             h_header = _parse_handling_header(table2[2][0] or "")
 
-            # Row 4: handling fee item
-            h_item_row = None
+            # Item row and tax block: classify both in one walk
+            h_item_row = h_tax_row = None
             for row in table2[3:]:
-                if row[0] and row[0].strip().rstrip(".").isdigit():
+                c0 = row[0]
+                if not c0:
+                    continue
+                if h_item_row is None and _SR_NO_RE.match(c0):
                     h_item_row = row
+                elif h_tax_row is None and "Taxes" in c0 and "CGST" in c0:
+                    h_tax_row = row
+                if h_item_row and h_tax_row:
                     break
-
-            # Tax block
-            h_tax_row = next(
-                (r for r in table2 if r[0] and "Taxes" in r[0] and "CGST" in r[0]),
-                None,
-            )
-            h_taxes = _parse_handling_tax(h_tax_row[0]) if h_tax_row else {}
+            # Defaults must apply even without a tax row: HandlingFee has
+            # no field defaults, so the **-unpack needs every key present
+            h_taxes = _parse_handling_tax(h_tax_row[0] if h_tax_row else "")
 
             # Build handling fee — may have a line item or be zero-fee
             if h_item_row:
-                h_desc = " ".join((h_item_row[1] or "").split())
+                h_desc = _WS_RE.sub(" ", h_item_row[1] or "").strip()
                 # Column layout varies (9 or 10 cols)
                 if len(h_item_row) >= 10:
                     h_unit_price = _pf(h_item_row[5])
@@ -327,52 +465,46 @@ def parse_instamart_detail(file_path: Path) -> InstamartInvoice | None:
                 h_nav = 0.0
 
             handling = HandlingFee(
-                invoice_no=h_header.get("invoice_no", ""),
-                date_of_invoice=h_header.get("date_of_invoice", ""),
-                hsn_code=h_taxes.get("hsn_code", ""),
-                hsn_description=h_taxes.get("hsn_description", ""),
-                category=h_header.get("category", ""),
-                transaction_type=h_header.get("transaction_type", ""),
-                invoice_type=h_header.get("invoice_type", ""),
-                reverse_charges=h_header.get("reverse_charges", "No").lower() == "yes",
-                swiggy_pan=h_header.get("swiggy_pan", ""),
-                swiggy_gstin=h_header.get("swiggy_gstin", ""),
-                swiggy_address=h_header.get("swiggy_address", ""),
-                swiggy_pincode=h_header.get("swiggy_pincode", ""),
-                swiggy_state_code=h_header.get("swiggy_state_code", ""),
+                **h_header,
+                **h_taxes,
                 description=h_desc,
                 unit_price=h_unit_price,
                 discount=h_discount,
                 net_assessable_value=h_nav,
-                cgst_rate=h_taxes.get("cgst_rate", 0.0),
-                cgst_amount=h_taxes.get("cgst_amount", 0.0),
-                sgst_rate=h_taxes.get("sgst_rate", 0.0),
-                sgst_amount=h_taxes.get("sgst_amount", 0.0),
-                state_cess_rate=h_taxes.get("state_cess_rate", 0.0),
-                state_cess_amount=h_taxes.get("state_cess_amount", 0.0),
-                total_taxes=h_taxes.get("total_taxes", 0.0),
-                invoice_total=h_taxes.get("invoice_total", 0.0),
             )
 
         return InstamartInvoice(
-            order_id=header.get("order_id", ""),
-            invoice_no=header.get("invoice_no", ""),
-            date_of_invoice=header.get("date_of_invoice", ""),
-            document_type=header.get("document_type", "INV"),
-            category=header.get("category", ""),
-            customer_name=header.get("customer_name", ""),
-            customer_gstin=header.get("customer_gstin", ""),
-            customer_address=header.get("customer_address", ""),
-            seller_name=header.get("seller_name", ""),
-            seller_gstin=header.get("seller_gstin", ""),
-            seller_fssai=header.get("seller_fssai", ""),
-            seller_address=header.get("seller_address", ""),
-            seller_city=header.get("seller_city", ""),
-            seller_state=header.get("seller_state", ""),
-            place_of_supply=header.get("place_of_supply", ""),
+            **header,
             invoice_value=invoice_value,
             items=items,
             handling_fee=handling,
         )
     finally:
         pdf.close()
+
+
+def parse_many(paths, workers: int | None = None) -> list[InstamartInvoice | None]:
+    """Parse a batch of PDFs in parallel across processes.
+
+    Parsing is CPU-bound and independent per file, so this scales with
+    cores; chunksize batches the IPC. Each worker also gets its own
+    short-lived parser objects, so per-document caches are freed with
+    the process instead of accumulating.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(parse_instamart_detail, paths, chunksize=8))
+
+
+def iter_parse(paths, workers: int | None = None):
+    """Yield parsed invoices for a batch of PDFs using a thread pool.
+
+    pdfplumber spends most of its time in native pdfminer code that
+    releases the GIL, so threads overlap the open+parse work without
+    the process-spawn and pickling cost of parse_many. Results come
+    back in input order as they complete, so callers can stream them
+    into the loader instead of holding the whole batch in memory.
+    """
+    if workers is None:
+        workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        yield from ex.map(parse_instamart_detail, paths)
@@ -1,13 +1,17 @@
 """Parse Swiggy summary PDFs to extract customer info, order rows, and View URLs."""
 
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from itertools import zip_longest
 from pathlib import Path
 
 import fitz  # PyMuPDF
 
+from parser._numutil import parse_amount as _parse_amount
 
-@dataclass
+
+@dataclass(slots=True)
 class OrderRow:
     date: str  # DD-MM-YYYY
     order_id: str
@@ -16,7 +20,7 @@ class OrderRow:
     detail_url: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SummaryData:
     order_type: str  # "food" or "instamart"
     customer_name: str
@@ -27,19 +31,15 @@ class SummaryData:
     orders: list[OrderRow] = field(default_factory=list)
 
 
-def _parse_amount(text: str) -> float:
-    """Parse '₹1,774.50' or '₹1774.50' to float."""
-    cleaned = text.replace("₹", "").replace(",", "").strip()
-    return float(cleaned)
+# Case-insensitive search skips the .lower() copy of every filename.
+_TYPE_RE = re.compile(r"food|instamart", re.IGNORECASE)
 
 
 def _detect_order_type(file_path: Path) -> str:
     """Detect if the PDF is food or instamart from filename."""
-    name = file_path.name.lower()
-    if "food" in name:
-        return "food"
-    elif "instamart" in name:
-        return "instamart"
+    m = _TYPE_RE.search(file_path.name)
+    if m:
+        return m.group().lower()
     raise ValueError(f"Cannot detect order type from filename: {file_path.name}")
 
 
@@ -60,25 +60,29 @@ def _extract_header(lines: list[str]) -> dict:
     """
     header = {}
     for i, line in enumerate(lines):
+        s = line.strip()
         # Labels appear as: "Customer Name" / "Number of Orders" / "Total Amount"
         # Values follow as:  "Dan Ny" / "36" / "₹44633.43"
-        if line.strip() == "Customer Name" and i + 5 < len(lines):
+        if s == "Customer Name" and i + 5 < len(lines):
             header["customer_name"] = lines[i + 3].strip()
             header["number_of_orders"] = int(lines[i + 4].strip())
             header["total_amount"] = _parse_amount(lines[i + 5].strip())
         # Labels: "Email" / "Date Range"
         # Values: "email@..." / "DD-MM-YYYY to DD-MM-YYYY"
-        elif line.strip() == "Email" and i + 3 < len(lines):
+        elif s == "Email" and i + 3 < len(lines):
             header["customer_email"] = lines[i + 2].strip()
             header["date_range"] = lines[i + 3].strip()
+        # All five fields found: the rest of the page is order rows
+        if len(header) >= 5:
+            break
     return header
 
 
-def _extract_urls(doc: fitz.Document) -> list[str]:
-    """Extract all hyperlink URLs from the PDF."""
+def _extract_urls(page_links: list[list[dict]]) -> list[str]:
+    """Extract all hyperlink URLs from pre-fetched per-page link lists."""
     urls = []
-    for page in doc:
-        for link in page.get_links():
+    for links in page_links:
+        for link in links:
             if "uri" in link:
                 urls.append(link["uri"])
     return urls
@@ -88,9 +92,25 @@ DATE_PATTERN = re.compile(r"^\d{2}-\d{2}-\d{4}$")
 ORDER_ID_PATTERN = re.compile(r"^\d{15}$")
 AMOUNT_PATTERN = re.compile(r"^₹[\d,.]+$")
 
+# The three row markers fused into one pattern: a single C-level finditer
+# scan over the page text replaces a Python while-loop that matched each
+# line against the patterns above individually.
+_ROW_RE = re.compile(
+    r"^[ \t]*(?P<date>\d{2}-\d{2}-\d{4})[ \t]*$"
+    r"|^[ \t]*(?P<oid>\d{15})[ \t]*$"
+    r"|^[ \t]*(?P<amt>₹[\d,.]+)[ \t]*$",
+    re.MULTILINE,
+)
+
+_NEED_DATE, _NEED_OID, _NEED_AMT = 0, 1, 2
+
+# Collapses the newlines and space runs of a multi-line name slice in
+# one scan, instead of splitting it into a list of stripped lines.
+_WS_RE = re.compile(r"\s+")
 
-def _extract_order_rows(doc: fitz.Document) -> list[dict]:
-    """Extract order rows by parsing lines sequentially.
+
+def _extract_order_rows(page_texts: list[str]) -> list[dict]:
+    """Extract order rows by scanning each page's text in one pass.
 
     Each order appears as consecutive lines:
         DD-MM-YYYY          (date)
@@ -99,49 +119,53 @@ def _extract_order_rows(doc: fitz.Document) -> list[dict]:
         ...                 (continued name lines)
         ₹1774.50            (amount)
         View                (link marker)
+
+    A tiny state machine driven by _ROW_RE matches walks date -> id ->
+    amount; the name lines are recovered by slicing the text between the
+    order_id and amount matches. Lines that match nothing ("View",
+    decorations) never reach Python code at all.
     """
     rows = []
 
-    for page in doc:
-        lines = page.get_text().split("\n")
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-
-            # Look for a date line as start of a row
-            if DATE_PATTERN.match(line):
-                date = line
-                i += 1
-
-                # Next should be order_id
-                if i < len(lines) and ORDER_ID_PATTERN.match(lines[i].strip()):
-                    order_id = lines[i].strip()
-                    i += 1
-
-                    # Collect name lines until we hit ₹amount
-                    name_parts = []
-                    while i < len(lines):
-                        candidate = lines[i].strip()
-                        if AMOUNT_PATTERN.match(candidate):
-                            amount = _parse_amount(candidate)
-                            i += 1
-                            # Skip "View" line
-                            if i < len(lines) and lines[i].strip() == "View":
-                                i += 1
-                            rows.append({
-                                "date": date,
-                                "order_id": order_id,
-                                "name": " ".join(name_parts),
-                                "amount": amount,
-                            })
-                            break
-                        else:
-                            name_parts.append(candidate)
-                            i += 1
-                else:
-                    i += 1
+    for text in page_texts:
+        state = _NEED_DATE
+        date = order_id = ""
+        date_end = oid_end = 0
+
+        for m in _ROW_RE.finditer(text):
+            kind = m.lastgroup
+            if kind == "date":
+                # A date while collecting name lines is part of the name;
+                # anywhere else it (re)starts a row.
+                if state != _NEED_AMT:
+                    date = m.group("date")
+                    date_end = m.end()
+                    state = _NEED_OID
+            elif kind == "oid":
+                if state == _NEED_OID:
+                    # order_id must be the line right after the date
+                    if not text[date_end:m.start()].strip():
+                        order_id = m.group("oid")
+                        oid_end = m.end()
+                        state = _NEED_AMT
+                    else:
+                        state = _NEED_DATE
+            elif state == _NEED_AMT:  # kind == "amt"
+                # Name lines sit between the order_id line and the
+                # amount line; trim those boundary lines off the slice
+                # and flatten the rest without a per-line split/strip.
+                seg = text[oid_end:m.start()]
+                name = seg[seg.find("\n") + 1:seg.rfind("\n") + 1]
+                rows.append({
+                    "date": date,
+                    "order_id": order_id,
+                    "name": _WS_RE.sub(" ", name).strip(),
+                    "amount": _parse_amount(m.group("amt")),
+                })
+                state = _NEED_DATE
             else:
-                i += 1
+                # Amount with no pending date+id pair: not a row start
+                state = _NEED_DATE
 
     return rows
 
@@ -153,15 +177,23 @@ def parse_summary(file_path: Path) -> SummaryData:
     doc = fitz.open(str(file_path))
 
     try:
-        # Extract header from first page
-        first_page_lines = doc[0].get_text().split("\n")
-        header = _extract_header(first_page_lines)
+        # Walk the document once, pulling each page's text and links
+        # together; the header and row scans both read page 0, PyMuPDF
+        # rebuilds text on every get_text() call, and a second doc
+        # iteration for links would re-touch every page object.
+        page_texts = []
+        page_links = []
+        for page in doc:
+            page_texts.append(page.get_text())
+            page_links.append(page.get_links())
+
+        header = _extract_header(page_texts[0].split("\n"))
 
         # Extract all View URLs
-        urls = _extract_urls(doc)
+        urls = _extract_urls(page_links)
 
         # Extract order rows from text
-        rows = _extract_order_rows(doc)
+        rows = _extract_order_rows(page_texts)
 
         if len(urls) != len(rows):
             print(
@@ -169,16 +201,19 @@ def parse_summary(file_path: Path) -> SummaryData:
                 f"in {file_path.name}"
             )
 
-        orders = []
-        for i, row in enumerate(rows):
-            url = urls[i] if i < len(urls) else ""
-            orders.append(OrderRow(
+        # zip_longest pairs rows with URLs in C, padding missing URLs
+        # with "" instead of a bounds check per iteration; the slice
+        # keeps surplus URLs from padding rows on the other side
+        orders = [
+            OrderRow(
                 date=row["date"],
                 order_id=row["order_id"],
                 name=row["name"],
                 amount=row["amount"],
                 detail_url=url,
-            ))
+            )
+            for row, url in zip_longest(rows, urls[:len(rows)], fillvalue="")
+        ]
 
         return SummaryData(
             order_type=order_type,
@@ -191,3 +226,15 @@ def parse_summary(file_path: Path) -> SummaryData:
         )
     finally:
         doc.close()
+
+
+def parse_many(paths, workers: int | None = None) -> list[SummaryData]:
+    """Parse a batch of PDFs in parallel across processes.
+
+    Parsing is CPU-bound and independent per file, so this scales with
+    cores; chunksize batches the IPC. Each worker also gets its own
+    short-lived parser objects, so per-document caches are freed with
+    the process instead of accumulating.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(parse_summary, paths, chunksize=8))
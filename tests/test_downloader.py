@@ -1,14 +1,46 @@
 """Tests for src/downloader.py."""
 
+import asyncio
+import logging
 from pathlib import Path
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from downloader import download_detail_pdfs
 
 
+def _mock_async_client(mock_client_cls):
+    """Wire up a mocked httpx.AsyncClient context manager; returns the ctx."""
+    mock_ctx = MagicMock()
+    mock_client_cls.return_value.__aenter__ = AsyncMock(return_value=mock_ctx)
+    mock_client_cls.return_value.__aexit__ = AsyncMock(return_value=False)
+    return mock_ctx
+
+
+def _mock_stream(mock_ctx, body=b"%PDF-1.4 content", error=None,
+                 status_code=200, etag=None):
+    """Make mock_ctx.stream(...) yield a response streaming `body` in chunks."""
+    mock_resp = MagicMock()
+    mock_resp.status_code = status_code
+    mock_resp.headers = {"etag": etag} if etag else {}
+
+    async def aiter_bytes(chunk_size):
+        for i in range(0, len(body), chunk_size):
+            yield body[i : i + chunk_size]
+
+    mock_resp.aiter_bytes = aiter_bytes
+    if error is not None:
+        mock_resp.raise_for_status.side_effect = error
+
+    stream_cm = MagicMock()
+    stream_cm.__aenter__ = AsyncMock(return_value=mock_resp)
+    stream_cm.__aexit__ = AsyncMock(return_value=False)
+    mock_ctx.stream.return_value = stream_cm
+    return mock_resp
+
+
 class TestDownloadDetailPdfs:
     def _make_order(self, order_id, url="https://example.com/pdf"):
         return SimpleNamespace(order_id=order_id, detail_url=url)
@@ -22,59 +54,179 @@ class TestDownloadDetailPdfs:
 
         orders = [self._make_order("111111111111111")]
 
-        with patch("downloader.httpx.Client") as mock_client:
-            result = download_detail_pdfs(orders, "food", tmp_path)
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
 
         assert "111111111111111" in result
         assert result["111111111111111"] == cached
         # Should not have made any HTTP calls
-        mock_client.return_value.__enter__.return_value.get.assert_not_called()
+        mock_ctx.stream.assert_not_called()
 
-    def test_missing_url(self, tmp_path, capsys):
+    def test_missing_url(self, tmp_path, caplog):
         """Orders with no URL should be skipped."""
         orders = [self._make_order("222222222222222", url="")]
 
-        with patch("downloader.httpx.Client") as mock_client:
-            mock_ctx = MagicMock()
-            mock_client.return_value.__enter__ = MagicMock(return_value=mock_ctx)
-            mock_client.return_value.__exit__ = MagicMock(return_value=False)
-            result = download_detail_pdfs(orders, "food", tmp_path)
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            _mock_async_client(mock_client)
+            with caplog.at_level(logging.INFO, logger="swiggyit"):
+                result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
 
         assert "222222222222222" not in result
-        assert "No URL" in capsys.readouterr().out
+        assert "No URL" in caplog.text
 
     def test_successful_download(self, tmp_path):
         """Successful HTTP download should save file."""
         orders = [self._make_order("333333333333333")]
 
-        with patch("downloader.httpx.Client") as mock_client:
-            mock_ctx = MagicMock()
-            mock_resp = MagicMock()
-            mock_resp.content = b"%PDF-1.4 downloaded content"
-            mock_ctx.get.return_value = mock_resp
-            mock_client.return_value.__enter__ = MagicMock(return_value=mock_ctx)
-            mock_client.return_value.__exit__ = MagicMock(return_value=False)
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, body=b"%PDF-1.4 downloaded content")
 
-            result = download_detail_pdfs(orders, "food", tmp_path)
+            result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
 
         assert "333333333333333" in result
         saved = tmp_path / "detail_food" / "333333333333333.pdf"
         assert saved.exists()
         assert saved.read_bytes() == b"%PDF-1.4 downloaded content"
 
-    def test_http_error(self, tmp_path, capsys):
+    def test_concurrent_downloads(self, tmp_path):
+        """Multiple orders should all be fetched."""
+        orders = [
+            self._make_order("111111111111111"),
+            self._make_order("222222222222222"),
+            self._make_order("333333333333333"),
+        ]
+
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx)
+
+            result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
+
+        assert len(result) == 3
+        assert mock_ctx.stream.call_count == 3
+
+    def test_etag_saved_on_download(self, tmp_path):
+        """The response ETag should be persisted to etags.json."""
+        import json
+
+        orders = [self._make_order("333333333333333")]
+
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, etag='"abc123"')
+
+            asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
+
+        etags = json.loads((tmp_path / "etags.json").read_text())
+        assert etags == {"333333333333333": '"abc123"'}
+
+    def test_etag_revalidation_304(self, tmp_path):
+        """A 304 reply should keep the cached file without rewriting it."""
+        import json
+
+        out_dir = tmp_path / "detail_food"
+        out_dir.mkdir()
+        cached = out_dir / "111111111111111.pdf"
+        cached.write_bytes(b"%PDF-1.4 cached")
+        (tmp_path / "etags.json").write_text(
+            json.dumps({"111111111111111": '"abc123"'})
+        )
+
+        orders = [self._make_order("111111111111111")]
+
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, status_code=304, body=b"")
+
+            result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
+
+        assert result["111111111111111"] == cached
+        assert cached.read_bytes() == b"%PDF-1.4 cached"
+        headers = mock_ctx.stream.call_args.kwargs["headers"]
+        assert headers == {"If-None-Match": '"abc123"'}
+
+    def test_revalidation_error_serves_cache(self, tmp_path, caplog):
+        """If the conditional GET fails, the cached file should still be used."""
+        import json
+
+        import httpx
+
+        out_dir = tmp_path / "detail_food"
+        out_dir.mkdir()
+        cached = out_dir / "111111111111111.pdf"
+        cached.write_bytes(b"%PDF-1.4 cached")
+        (tmp_path / "etags.json").write_text(
+            json.dumps({"111111111111111": '"abc123"'})
+        )
+
+        orders = [self._make_order("111111111111111")]
+
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, error=httpx.HTTPError("503 Unavailable"))
+
+            with caplog.at_level(logging.INFO, logger="swiggyit"):
+                result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
+
+        assert result["111111111111111"] == cached
+        assert "Revalidation failed" in caplog.text
+
+    def test_non_pdf_body_rejected(self, tmp_path, caplog):
+        """A response without PDF magic bytes should not be cached."""
+        orders = [self._make_order("555555555555555")]
+
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, body=b"<html>expired link</html>")
+
+            with caplog.at_level(logging.INFO, logger="swiggyit"):
+                result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
+
+        assert "555555555555555" not in result
+        assert "Not a PDF" in caplog.text
+        assert not (tmp_path / "detail_food" / "555555555555555.pdf").exists()
+
+    def test_non_pdf_body_serves_cache(self, tmp_path, caplog):
+        """A non-PDF reply to a revalidation should keep the cached file."""
+        import json
+
+        out_dir = tmp_path / "detail_food"
+        out_dir.mkdir()
+        cached = out_dir / "111111111111111.pdf"
+        cached.write_bytes(b"%PDF-1.4 cached")
+        (tmp_path / "etags.json").write_text(
+            json.dumps({"111111111111111": '"abc123"'})
+        )
+
+        orders = [self._make_order("111111111111111")]
+
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, body=b"<Error>expired link</Error>")
+
+            with caplog.at_level(logging.INFO, logger="swiggyit"):
+                result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
+
+        assert result["111111111111111"] == cached
+        assert cached.read_bytes() == b"%PDF-1.4 cached"
+        assert "using cached copy" in caplog.text
+
+    def test_http_error(self, tmp_path, caplog):
         """HTTP errors should be handled gracefully."""
         import httpx
 
         orders = [self._make_order("444444444444444")]
 
-        with patch("downloader.httpx.Client") as mock_client:
-            mock_ctx = MagicMock()
-            mock_ctx.get.side_effect = httpx.HTTPError("500 Server Error")
-            mock_client.return_value.__enter__ = MagicMock(return_value=mock_ctx)
-            mock_client.return_value.__exit__ = MagicMock(return_value=False)
+        with patch("downloader.httpx.AsyncClient") as mock_client:
+            mock_ctx = _mock_async_client(mock_client)
+            _mock_stream(mock_ctx, error=httpx.HTTPError("500 Server Error"))
 
-            result = download_detail_pdfs(orders, "food", tmp_path)
+            with caplog.at_level(logging.INFO, logger="swiggyit"):
+                result = asyncio.run(download_detail_pdfs(orders, "food", tmp_path))
 
         assert "444444444444444" not in result
-        assert "Failed to download" in capsys.readouterr().out
+        assert "Failed to download" in caplog.text
+        # No partial file should be left behind
+        assert list((tmp_path / "detail_food").glob("*.part")) == []
@@ -2,7 +2,13 @@
 
 import pytest
 
-from parser.food_parser import _parse_float, _parse_header, _parse_tax_block, _parse_eco_block
+from parser.food_parser import (
+    _food_invoice_from_text,
+    _parse_eco_block,
+    _parse_float,
+    _parse_header,
+    _parse_tax_block,
+)
 
 
 class TestParseFloat:
@@ -138,3 +144,68 @@ class TestParseEcoBlock:
         eco = _parse_eco_block("")
         assert eco["eco_name"] == ""
         assert eco["eco_gstin"] == ""
+
+
+class TestFoodInvoiceFromText:
+    SAMPLE_TEXT = (
+        "Invoice To: Dan Ny  Invoice issued by:\n"
+        "Customer Address: 123 Main St  Restaurant GSTIN: 29AABCT1234Z1\n"
+        "Order ID: 123456789012345\n"
+        "Invoice No: S-INV-2025-001\n"
+        "Restaurant Name: Test Kitchen\n"
+        "Restaurant FSSAI License: 11234567890123\n"
+        "Address: Plot 1, MG Road\n"
+        "State: Karnataka\n"
+        "1. Paneer Tikka Masala Nos 1 250.00 250.00 0.00 250.00\n"
+        "2. Butter Naan Nos 2 40.00 80.00 0.00 80.00\n"
+        "Subtotal 330.00\n"
+        "Taxes CGST 2.5% 8.25\n"
+        "SGST/UTGST 2.5% 8.25\n"
+        "Total taxes 16.50\n"
+        "Invoice Total 346.50\n"
+        "ECO under GST\n"
+        "Name: Bundl Technologies\n"
+    )
+
+    def test_items(self):
+        inv = _food_invoice_from_text(self.SAMPLE_TEXT)
+        assert len(inv.items) == 2
+        assert inv.items[0].description == "Paneer Tikka Masala"
+        assert inv.items[1].quantity == 2
+        assert inv.subtotal == 330.0
+
+    def test_header_and_taxes(self):
+        inv = _food_invoice_from_text(self.SAMPLE_TEXT)
+        assert inv.order_id == "123456789012345"
+        assert inv.restaurant_name == "Test Kitchen"
+        assert inv.cgst_rate == 2.5
+        assert inv.invoice_total == 346.50
+        assert inv.eco_name == "Bundl Technologies"
+
+    def test_no_header_falls_back(self):
+        # Items and subtotal alone aren't enough: without an order_id
+        # the caller must get None and try the table path instead
+        no_header = (
+            "1. Paneer Tikka Masala Nos 1 250.00 250.00 0.00 250.00\n"
+            "Subtotal 250.00\n"
+        )
+        assert _food_invoice_from_text(no_header) is None
+
+    def test_missing_address_falls_back(self):
+        # The name/address patterns depend on column gaps surviving
+        # extract_text() as runs of spaces; when one of them comes back
+        # empty the fast path must defer to the table rendering instead
+        # of loading blank customer/restaurant fields
+        no_address = (
+            "Invoice To: Dan Ny  Invoice issued by:\n"
+            "Order ID: 123456789012345\n"
+            "1. Paneer Tikka Masala Nos 1 250.00 250.00 0.00 250.00\n"
+            "Subtotal 250.00\n"
+        )
+        assert _food_invoice_from_text(no_address) is None
+
+    def test_no_subtotal_falls_back(self):
+        assert _food_invoice_from_text("no item section here") is None
+
+    def test_no_items_falls_back(self):
+        assert _food_invoice_from_text("Subtotal 330.00\n") is None
@@ -99,8 +99,10 @@ class TestParseHandlingHeader:
         assert d["invoice_no"] == "HF-2025-001"
 
     def test_reverse_charges(self):
+        # Converted to bool in the helper so the dict unpacks into
+        # HandlingFee directly
         d = _parse_handling_header(self.SAMPLE)
-        assert d["reverse_charges"] == "No"
+        assert d["reverse_charges"] is False
 
     def test_empty(self):
         d = _parse_handling_header("")
@@ -140,3 +142,15 @@ class TestParseHandlingTax:
         t = _parse_handling_tax("")
         assert t["total_taxes"] == 0.0
         assert t["invoice_total"] == 0.0
+
+    def test_no_tax_row_covers_all_fields(self):
+        # A page 2 without a recognizable tax row must still yield every
+        # tax field, since HandlingFee(**taxes, ...) has no defaults
+        t = _parse_handling_tax("")
+        assert set(t) == {
+            "hsn_code", "hsn_description",
+            "cgst_rate", "cgst_amount",
+            "sgst_rate", "sgst_amount",
+            "state_cess_rate", "state_cess_amount",
+            "total_taxes", "invoice_total",
+        }
@@ -26,6 +26,175 @@ class TestValidateDate:
             validate_date("")
 
 
+class TestEnsureSchema:
+    def _mock_conn(self):
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        return mock_conn, mock_cursor
+
+    def test_applies_when_hash_unknown(self, tmp_path):
+        from loader import ensure_schema
+
+        schema = tmp_path / "schema.sql"
+        schema.write_text("CREATE TABLE IF NOT EXISTS t (id int);")
+        mock_conn, mock_cursor = self._mock_conn()
+        mock_cursor.fetchone.return_value = None
+
+        assert ensure_schema(mock_conn, schema) is True
+        sqls = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert any("CREATE TABLE IF NOT EXISTS t" in s for s in sqls)
+        assert any("INSERT INTO _schema_meta" in s for s in sqls)
+
+    def test_skips_when_hash_matches(self, tmp_path):
+        from loader import ensure_schema
+
+        schema = tmp_path / "schema.sql"
+        schema.write_text("CREATE TABLE IF NOT EXISTS t (id int);")
+        mock_conn, mock_cursor = self._mock_conn()
+        mock_cursor.fetchone.return_value = (1,)
+
+        assert ensure_schema(mock_conn, schema) is False
+        sqls = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert not any("CREATE TABLE IF NOT EXISTS t" in s for s in sqls)
+
+
+class TestItemStaging:
+    def test_flush_moves_and_truncates(self):
+        from loader import flush_item_staging
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        flush_item_staging(mock_conn)
+
+        # One INSERT ... SELECT and one TRUNCATE per staging table
+        sqls = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert sum("INSERT INTO" in s for s in sqls) == 2
+        assert sum("TRUNCATE" in s for s in sqls) == 2
+
+    def test_flush_names_columns_and_dedupes(self):
+        from loader import flush_item_staging
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        flush_item_staging(mock_conn)
+
+        inserts = [
+            c[0][0]
+            for c in mock_cursor.execute.call_args_list
+            if "INSERT INTO" in c[0][0]
+        ]
+        for sql in inserts:
+            # Never SELECT *: the stage carries the serial id and the
+            # insert must not depend on physical column order
+            assert "SELECT *" not in sql
+            assert "DISTINCT ON (order_id, sr_no)" in sql
+            assert "ON CONFLICT (order_id, sr_no) DO NOTHING" in sql
+
+    def test_recreate_drops_stages(self):
+        from loader import ensure_item_staging
+
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
+        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+
+        ensure_item_staging(mock_conn, recreate=True)
+
+        sqls = [c[0][0] for c in mock_cursor.execute.call_args_list]
+        assert sum("DROP TABLE IF EXISTS" in s for s in sqls) == 2
+        assert sum("CREATE UNLOGGED TABLE" in s for s in sqls) == 2
+
+
+class TestCopyRowSerialization:
+    """Drive psycopg's real binary COPY formatter over the row builders.
+
+    The upsert tests mock cur.copy, so they never exercise the binary
+    dumpers; with the columns pinned to "numeric" via set_types, psycopg
+    refuses to dump float and the first item row of every order would
+    crash. Serializing one row here keeps that path honest.
+    """
+
+    @staticmethod
+    def _serialize(row, type_names):
+        from psycopg import postgres
+        from psycopg._copy_base import BinaryFormatter
+        from psycopg.adapt import Transformer
+        from psycopg.pq import Format
+
+        transformer = Transformer()
+        oids = [postgres.types[name].oid for name in type_names]
+        transformer.set_dumper_types(oids, Format.BINARY)
+        formatter = BinaryFormatter(transformer)
+        formatter.write_row(row)
+        return formatter.end()
+
+    def test_food_item_row_serializes(self):
+        from loader import FOOD_ITEMS_COPY_TYPES, _food_item_row
+
+        item = SimpleNamespace(
+            sr_no=1, description="Biryani", unit_of_measure="Nos",
+            quantity=1, unit_price=500.0, amount=500.0,
+            discount=0.0, net_assessable_value=500.0,
+        )
+        row = _food_item_row(123456789012345, item)
+        assert len(row) == len(FOOD_ITEMS_COPY_TYPES)
+        assert self._serialize(row, FOOD_ITEMS_COPY_TYPES)
+
+    def test_instamart_item_row_serializes(self):
+        from loader import INSTAMART_ITEMS_COPY_TYPES, _instamart_item_row
+
+        item = SimpleNamespace(
+            sr_no=1, description="Milk", quantity=2, uqc="LTR",
+            hsn_sac_code="04012000", taxable_value=100.0,
+            discount=10.0, net_taxable_value=90.0,
+            cgst_rate=2.5, cgst_amount=2.25,
+            sgst_rate=2.5, sgst_amount=2.25,
+            cess_rate=0.0, cess_amount=0.0,
+            additional_cess=0.0, total_amount=94.50,
+        )
+        row = _instamart_item_row(220939704984728, item)
+        assert len(row) == len(INSTAMART_ITEMS_COPY_TYPES)
+        assert self._serialize(row, INSTAMART_ITEMS_COPY_TYPES)
+
+    def test_numeric_fields_are_decimal(self):
+        from decimal import Decimal
+
+        from loader import (
+            FOOD_ITEMS_COPY_TYPES,
+            INSTAMART_ITEMS_COPY_TYPES,
+            _food_item_row,
+            _instamart_item_row,
+        )
+
+        food_row = _food_item_row(1, SimpleNamespace(
+            sr_no=1, description="x", unit_of_measure="Nos",
+            quantity=1, unit_price=1.5, amount=1.5,
+            discount=0.0, net_assessable_value=1.5,
+        ))
+        im_row = _instamart_item_row(1, SimpleNamespace(
+            sr_no=1, description="x", quantity=1, uqc="Nos",
+            hsn_sac_code="1", taxable_value=1.5, discount=0.0,
+            net_taxable_value=1.5, cgst_rate=0.0, cgst_amount=0.0,
+            sgst_rate=0.0, sgst_amount=0.0, cess_rate=0.0,
+            cess_amount=0.0, additional_cess=0.0, total_amount=1.5,
+        ))
+        for row, types in (
+            (food_row, FOOD_ITEMS_COPY_TYPES),
+            (im_row, INSTAMART_ITEMS_COPY_TYPES),
+        ):
+            for value, type_name in zip(row, types):
+                if type_name == "numeric":
+                    assert isinstance(value, Decimal)
+
+
 class TestUpsertFoodOrder:
     def _make_food_inv(self):
         return SimpleNamespace(
@@ -68,27 +237,28 @@ class TestUpsertFoodOrder:
     def test_upsert_calls_sql(self):
         from loader import upsert_food_order
 
-        mock_conn = MagicMock()
         mock_cursor = MagicMock()
-        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
-        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn = mock_cursor.connection
 
         inv = self._make_food_inv()
-        upsert_food_order(mock_conn, inv, 1, "https://example.com/pdf")
+        upsert_food_order(mock_cursor, inv, 1, "https://example.com/pdf")
 
-        # Should call execute 3 times: insert order, delete items, insert item
-        assert mock_cursor.execute.call_count == 3
+        # execute: insert order + delete items; items go through COPY
+        assert mock_cursor.execute.call_count == 2
+        assert mock_cursor.copy.call_count == 1
+        copy_writer = mock_cursor.copy.return_value.__enter__.return_value
+        assert copy_writer.write_row.call_count == 1
+        # Statements should run inside pipeline mode
+        mock_conn.pipeline.assert_called_once()
 
     def test_delete_before_insert_items(self):
         from loader import upsert_food_order
 
-        mock_conn = MagicMock()
         mock_cursor = MagicMock()
-        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
-        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn = mock_cursor.connection
 
         inv = self._make_food_inv()
-        upsert_food_order(mock_conn, inv, 1, "https://example.com/pdf")
+        upsert_food_order(mock_cursor, inv, 1, "https://example.com/pdf")
 
         # Second call should be DELETE
         second_call_sql = mock_cursor.execute.call_args_list[1][0][0]
@@ -131,24 +301,24 @@ class TestUpsertInstamartOrder:
     def test_upsert_calls_sql(self):
         from loader import upsert_instamart_order
 
-        mock_conn = MagicMock()
         mock_cursor = MagicMock()
-        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
-        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn = mock_cursor.connection
 
         inv = self._make_instamart_inv()
-        upsert_instamart_order(mock_conn, inv, 1, "https://example.com/pdf")
+        upsert_instamart_order(mock_cursor, inv, 1, "https://example.com/pdf")
 
-        # insert order, delete items, insert item = 3 calls (no handling fee)
-        assert mock_cursor.execute.call_count == 3
+        # execute: insert order + delete items (no handling fee);
+        # items go through COPY
+        assert mock_cursor.execute.call_count == 2
+        assert mock_cursor.copy.call_count == 1
+        # Statements should run inside pipeline mode
+        mock_conn.pipeline.assert_called_once()
 
     def test_with_handling_fee(self):
         from loader import upsert_instamart_order
 
-        mock_conn = MagicMock()
         mock_cursor = MagicMock()
-        mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
-        mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn = mock_cursor.connection
 
         inv = self._make_instamart_inv()
         inv.handling_fee = SimpleNamespace(
@@ -176,7 +346,9 @@ class TestUpsertInstamartOrder:
             invoice_total=59.0,
         )
 
-        upsert_instamart_order(mock_conn, inv, 1, "https://example.com/pdf")
+        upsert_instamart_order(mock_cursor, inv, 1, "https://example.com/pdf")
 
-        # insert order + delete items + insert item + insert handling = 4
-        assert mock_cursor.execute.call_count == 4
+        # insert order + delete items + insert handling = 3 executes,
+        # plus one COPY for the item batch
+        assert mock_cursor.execute.call_count == 3
+        assert mock_cursor.copy.call_count == 1
@@ -16,56 +16,57 @@ from pathlib import Path
 
 
 class TestParseAmount:
-    def test_normal(self):
-        assert _parse_amount("₹1,774.50") == 1774.50
+    @pytest.mark.parametrize("text,expected", [
+        ("₹1,774.50", 1774.50),
+        ("₹500.00", 500.0),
+        ("₹44,633.43", 44633.43),
+        ("1774.50", 1774.50),
+        ("  ₹1,774.50  ", 1774.50),
+        ("₹0.00", 0.0),
+    ])
+    def test_parse_amount(self, text, expected):
+        assert _parse_amount(text) == expected
 
-    def test_no_comma(self):
-        assert _parse_amount("₹500.00") == 500.0
 
-    def test_large(self):
-        assert _parse_amount("₹44,633.43") == 44633.43
-
-    def test_no_rupee_symbol(self):
-        assert _parse_amount("1774.50") == 1774.50
-
-    def test_whitespace(self):
-        assert _parse_amount("  ₹1,774.50  ") == 1774.50
-
-    def test_zero(self):
-        assert _parse_amount("₹0.00") == 0.0
+# Paths constructed once at import; Path() re-parses its argument on
+# every call, which the parametrize table doesn't need to repeat.
+_UNKNOWN_PATH = Path("order_summary_789.pdf")
 
 
 class TestDetectOrderType:
-    def test_food(self):
-        assert _detect_order_type(Path("order_summary_food_123.pdf")) == "food"
-
-    def test_instamart(self):
-        assert _detect_order_type(Path("order_summary_instamart_456.pdf")) == "instamart"
+    @pytest.mark.parametrize("path,expected", [
+        (Path("order_summary_food_123.pdf"), "food"),
+        (Path("order_summary_instamart_456.pdf"), "instamart"),
+        (Path("Order_Summary_FOOD_123.pdf"), "food"),
+    ])
+    def test_detected(self, path, expected):
+        assert _detect_order_type(path) == expected
 
     def test_unknown(self):
         with pytest.raises(ValueError, match="Cannot detect"):
-            _detect_order_type(Path("order_summary_789.pdf"))
-
-    def test_case_insensitive(self):
-        assert _detect_order_type(Path("Order_Summary_FOOD_123.pdf")) == "food"
+            _detect_order_type(_UNKNOWN_PATH)
+
+
+# Canonical first-page lines, built once at import; tests copy into a
+# list rather than re-allocating the literal per call.
+_FULL_HEADER_LINES = (
+    "some preamble",
+    "Customer Name",
+    "Number of Orders",
+    "Total Amount",
+    "John Doe",
+    "36",
+    "₹44633.43",
+    "Email",
+    "Date Range",
+    "john@example.com",
+    "09-08-2025 to 09-02-2026",
+)
 
 
 class TestExtractHeader:
     def test_full_header(self):
-        lines = [
-            "some preamble",
-            "Customer Name",
-            "Number of Orders",
-            "Total Amount",
-            "John Doe",
-            "36",
-            "₹44633.43",
-            "Email",
-            "Date Range",
-            "john@example.com",
-            "09-08-2025 to 09-02-2026",
-        ]
-        header = _extract_header(lines)
+        header = _extract_header(list(_FULL_HEADER_LINES))
         assert header["customer_name"] == "John Doe"
         assert header["number_of_orders"] == 36
         assert header["total_amount"] == 44633.43
@@ -78,28 +79,28 @@ class TestExtractHeader:
         assert header == {}
 
 
+# Bound once at import: the parametrize table then carries the match
+# callables directly, with no attribute lookup left in the test body.
+_date_match = DATE_PATTERN.match
+_oid_match = ORDER_ID_PATTERN.match
+_amt_match = AMOUNT_PATTERN.match
+
+
 class TestRegexPatterns:
-    def test_date_pattern_valid(self):
-        assert DATE_PATTERN.match("09-08-2025")
-        assert DATE_PATTERN.match("01-01-2026")
-
-    def test_date_pattern_invalid(self):
-        assert not DATE_PATTERN.match("2025-08-09")
-        assert not DATE_PATTERN.match("9-8-2025")
-
-    def test_order_id_pattern_valid(self):
-        assert ORDER_ID_PATTERN.match("123456789012345")
-
-    def test_order_id_pattern_invalid(self):
-        assert not ORDER_ID_PATTERN.match("12345")
-        assert not ORDER_ID_PATTERN.match("1234567890123456")
-        assert not ORDER_ID_PATTERN.match("12345678901234a")
-
-    def test_amount_pattern_valid(self):
-        assert AMOUNT_PATTERN.match("₹1,774.50")
-        assert AMOUNT_PATTERN.match("₹500")
-        assert AMOUNT_PATTERN.match("₹44633.43")
-
-    def test_amount_pattern_invalid(self):
-        assert not AMOUNT_PATTERN.match("1774.50")
-        assert not AMOUNT_PATTERN.match("Rs 1774")
+    @pytest.mark.parametrize("match,text,matches", [
+        (_date_match, "09-08-2025", True),
+        (_date_match, "01-01-2026", True),
+        (_date_match, "2025-08-09", False),
+        (_date_match, "9-8-2025", False),
+        (_oid_match, "123456789012345", True),
+        (_oid_match, "12345", False),
+        (_oid_match, "1234567890123456", False),
+        (_oid_match, "12345678901234a", False),
+        (_amt_match, "₹1,774.50", True),
+        (_amt_match, "₹500", True),
+        (_amt_match, "₹44633.43", True),
+        (_amt_match, "1774.50", False),
+        (_amt_match, "Rs 1774", False),
+    ])
+    def test_pattern(self, match, text, matches):
+        assert bool(match(text)) is matches
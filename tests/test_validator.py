@@ -1,7 +1,9 @@
 """Tests for src/validator.py."""
 
+import logging
 import tempfile
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
@@ -11,33 +13,55 @@ from validator import (
     validate_email,
     validate_invoice_fields,
     validate_order_id,
+    validate_pdf_bytes,
     validate_pdf_file,
     validate_summary_counts,
     validate_summary_folder,
 )
 
 
+@pytest.fixture(scope="session")
+def pdf_dir(tmp_path_factory):
+    """Materialize the sample PDF files once for the whole session."""
+    d = tmp_path_factory.mktemp("pdfs")
+    (d / "valid.pdf").write_bytes(b"%PDF-1.4 fake content")
+    (d / "empty.pdf").write_bytes(b"")
+    (d / "bad.pdf").write_bytes(b"<html>not a pdf</html>")
+    return d
+
+
+# Under pytest-xdist --dist=loadgroup this keeps the disk-touching
+# tests on one worker, so the session-scoped files are written once
+# instead of once per worker.
+@pytest.mark.xdist_group("validator-io")
 class TestValidatePdfFile:
-    def test_valid_pdf(self, tmp_path):
-        pdf = tmp_path / "test.pdf"
-        pdf.write_bytes(b"%PDF-1.4 fake content")
-        validate_pdf_file(pdf)  # should not raise
+    def test_valid_pdf(self, pdf_dir):
+        validate_pdf_file(pdf_dir / "valid.pdf")  # should not raise
 
-    def test_missing_file(self, tmp_path):
+    def test_missing_file(self, pdf_dir):
         with pytest.raises(ValidationError, match="File not found"):
-            validate_pdf_file(tmp_path / "nope.pdf")
+            validate_pdf_file(pdf_dir / "nope.pdf")
+
+    def test_empty_file(self, pdf_dir):
+        with pytest.raises(ValidationError, match="Empty file"):
+            validate_pdf_file(pdf_dir / "empty.pdf")
+
+    def test_bad_magic_bytes(self, pdf_dir):
+        with pytest.raises(ValidationError, match="Not a valid PDF"):
+            validate_pdf_file(pdf_dir / "bad.pdf")
 
-    def test_empty_file(self, tmp_path):
-        pdf = tmp_path / "empty.pdf"
-        pdf.write_bytes(b"")
+
+class TestValidatePdfBytes:
+    def test_valid_bytes(self):
+        validate_pdf_bytes(b"%PDF-1.4 fake content", "test.pdf")  # should not raise
+
+    def test_empty_bytes(self):
         with pytest.raises(ValidationError, match="Empty file"):
-            validate_pdf_file(pdf)
+            validate_pdf_bytes(b"", "empty.pdf")
 
-    def test_bad_magic_bytes(self, tmp_path):
-        pdf = tmp_path / "bad.pdf"
-        pdf.write_bytes(b"<html>not a pdf</html>")
+    def test_bad_magic_bytes(self):
         with pytest.raises(ValidationError, match="Not a valid PDF"):
-            validate_pdf_file(pdf)
+            validate_pdf_bytes(b"<html>not a pdf</html>", "bad.pdf")
 
 
 class TestValidateSummaryFolder:
@@ -106,64 +130,69 @@ class TestValidateDate:
 
 
 class TestValidateEmail:
-    def test_valid_email(self, capsys):
-        assert validate_email("user@example.com") is True
-        assert capsys.readouterr().out == ""
+    def test_valid_email(self, caplog):
+        with caplog.at_level(logging.INFO, logger="swiggyit"):
+            assert validate_email("user@example.com") is True
+        assert caplog.text == ""
+
+    def test_empty_email(self, caplog):
+        with caplog.at_level(logging.INFO, logger="swiggyit"):
+            assert validate_email("") is False
+        assert "Empty customer email" in caplog.text
+
+    def test_bad_format(self, caplog):
+        with caplog.at_level(logging.INFO, logger="swiggyit"):
+            assert validate_email("not-an-email") is False
+        assert "Suspicious email" in caplog.text
+
+    def test_no_domain(self, caplog):
+        assert validate_email("user@") is False
 
-    def test_empty_email(self, capsys):
-        assert validate_email("") is False
-        assert "Empty customer email" in capsys.readouterr().out
 
-    def test_bad_format(self, capsys):
-        assert validate_email("not-an-email") is False
-        assert "Suspicious email" in capsys.readouterr().out
+# Built once at import; the factories merge overrides into a copy
+# instead of re-declaring the full field dict per test.
+_FOOD_INV_DEFAULTS = {
+    "order_id": "123456789012345",
+    "date_of_invoice": "01-01-2025",
+    "invoice_no": "INV001",
+    "restaurant_name": "Test Restaurant",
+    "invoice_total": 500.0,
+    "items": [{"desc": "item"}],
+}
 
-    def test_no_domain(self, capsys):
-        assert validate_email("user@") is False
+_INSTAMART_INV_DEFAULTS = {
+    "order_id": "123456789012345",
+    "date_of_invoice": "01-01-2025",
+    "invoice_no": "INV001",
+    "seller_name": "Test Seller",
+    "invoice_value": 500.0,
+    "items": [{"desc": "item"}],
+}
 
 
 class TestValidateInvoiceFields:
     def _make_food_inv(self, **overrides):
-        from types import SimpleNamespace
-        defaults = {
-            "order_id": "123456789012345",
-            "date_of_invoice": "01-01-2025",
-            "invoice_no": "INV001",
-            "restaurant_name": "Test Restaurant",
-            "invoice_total": 500.0,
-            "items": [{"desc": "item"}],
-        }
-        defaults.update(overrides)
-        return SimpleNamespace(**defaults)
+        return SimpleNamespace(**{**_FOOD_INV_DEFAULTS, **overrides})
 
     def _make_instamart_inv(self, **overrides):
-        from types import SimpleNamespace
-        defaults = {
-            "order_id": "123456789012345",
-            "date_of_invoice": "01-01-2025",
-            "invoice_no": "INV001",
-            "seller_name": "Test Seller",
-            "invoice_value": 500.0,
-            "items": [{"desc": "item"}],
-        }
-        defaults.update(overrides)
-        return SimpleNamespace(**defaults)
+        return SimpleNamespace(**{**_INSTAMART_INV_DEFAULTS, **overrides})
 
     def test_valid_food(self):
         assert validate_invoice_fields(self._make_food_inv(), "food") is True
 
-    def test_missing_restaurant(self, capsys):
-        assert validate_invoice_fields(
-            self._make_food_inv(restaurant_name=""), "food"
-        ) is False
-        assert "Missing restaurant_name" in capsys.readouterr().out
+    def test_missing_restaurant(self, caplog):
+        with caplog.at_level(logging.INFO, logger="swiggyit"):
+            assert validate_invoice_fields(
+                self._make_food_inv(restaurant_name=""), "food"
+            ) is False
+        assert "Missing restaurant_name" in caplog.text
 
-    def test_zero_total(self, capsys):
+    def test_zero_total(self):
         assert validate_invoice_fields(
             self._make_food_inv(invoice_total=0), "food"
         ) is False
 
-    def test_no_items(self, capsys):
+    def test_no_items(self):
         assert validate_invoice_fields(
             self._make_food_inv(items=[]), "food"
         ) is False
@@ -171,7 +200,7 @@ class TestValidateInvoiceFields:
     def test_valid_instamart(self):
         assert validate_invoice_fields(self._make_instamart_inv(), "instamart") is True
 
-    def test_missing_seller(self, capsys):
+    def test_missing_seller(self):
         assert validate_invoice_fields(
             self._make_instamart_inv(seller_name=""), "instamart"
         ) is False
@@ -179,12 +208,11 @@ class TestValidateInvoiceFields:
 
 class TestValidateSummaryCounts:
     def test_matching_counts(self):
-        from types import SimpleNamespace
         s = SimpleNamespace(number_of_orders=3, orders=[1, 2, 3])
         assert validate_summary_counts(s) is True
 
-    def test_mismatched_counts(self, capsys):
-        from types import SimpleNamespace
+    def test_mismatched_counts(self, caplog):
         s = SimpleNamespace(number_of_orders=5, orders=[1, 2, 3])
-        assert validate_summary_counts(s) is False
-        assert "header says 5" in capsys.readouterr().out
+        with caplog.at_level(logging.INFO, logger="swiggyit"):
+            assert validate_summary_counts(s) is False
+        assert "header says 5" in caplog.text